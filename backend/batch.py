@@ -0,0 +1,173 @@
+"""Respostas em lote: deduplica as perguntas e responde com paralelismo
+limitado.
+
+Usado pelo endpoint /query/batch e pela linha de comando, que responde um
+arquivo JSONL sem precisar do servidor no ar (com o backend de LLM
+configurado no ambiente, ou só com o fallback):
+
+    python batch.py perguntas.jsonl --output respostas.jsonl --concurrency 8
+
+Cada linha de entrada é {"query": "..."} (outros campos, como um id, são
+repetidos na saída) ou só a pergunta como string JSON.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from contextlib import redirect_stdout
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from cache import normalize_query
+from config import BATCH_LLM_CONCURRENCY
+
+# (resposta, origem) para uma pergunta
+Answerer = Callable[[str], Awaitable[Tuple[str, str]]]
+# Resposta imediata (direta ou do cache), sem ocupar vaga; None se não houver
+QuickAnswerer = Callable[[str], Optional[Tuple[str, str]]]
+
+
+class BatchResult(NamedTuple):
+    indexes: List[int]  # posições da pergunta na entrada (repetidas são agrupadas)
+    query: str
+    answer: str
+    source: str
+
+
+# Agrupar perguntas iguais (após a normalização usada no cache).
+# Retorna as perguntas únicas e, para cada uma, as posições em que aparece.
+def dedupe(queries: List[str]) -> Tuple[List[str], List[List[int]]]:
+    positions: Dict[str, int] = {}
+    unique: List[str] = []
+    indexes: List[List[int]] = []
+    for index, query in enumerate(queries):
+        key = normalize_query(query)
+        if key not in positions:
+            positions[key] = len(unique)
+            unique.append(query)
+            indexes.append([])
+        indexes[positions[key]].append(index)
+    return unique, indexes
+
+
+# Responder o lote, entregando cada resultado assim que fica pronto.
+# Respostas imediatas saem primeiro; as demais (LLM) rodam no máximo
+# `concurrency` de cada vez. Se o consumidor parar, o que falta é cancelado.
+async def run_batch(
+    queries: List[str],
+    answer: Answerer,
+    concurrency: int,
+    quick: Optional[QuickAnswerer] = None,
+) -> AsyncIterator[BatchResult]:
+    unique, indexes = dedupe(queries)
+
+    pending: List[int] = []
+    for position, query in enumerate(unique):
+        ready = quick(query) if quick is not None else None
+        if ready is not None:
+            yield BatchResult(indexes[position], query, *ready)
+        else:
+            pending.append(position)
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(position: int) -> BatchResult:
+        async with semaphore:
+            query = unique[position]
+            return BatchResult(indexes[position], query, *await answer(query))
+
+    tasks = [asyncio.ensure_future(run(position)) for position in pending]
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            yield await next_result
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+# Responder o lote e devolver os resultados na ordem da entrada
+async def answer_batch(
+    queries: List[str],
+    answer: Answerer,
+    concurrency: int,
+    quick: Optional[QuickAnswerer] = None,
+) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = [{} for _ in queries]
+    async for result in run_batch(queries, answer, concurrency, quick):
+        for index in result.indexes:
+            results[index] = {
+                "query": queries[index],
+                "answer": result.answer,
+                "source": result.source,
+            }
+    return results
+
+
+def read_jsonl(path: str) -> List[Dict[str, Any]]:
+    items = []
+    with open(path, "r", encoding="utf-8") as file:
+        for number, line in enumerate(file, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line)
+            if isinstance(item, str):
+                item = {"query": item}
+            if not isinstance(item, dict) or not isinstance(item.get("query"), str):
+                raise ValueError(f'Linha {number}: esperado {{"query": "..."}}')
+            items.append(item)
+    return items
+
+
+async def run_file(args: argparse.Namespace) -> None:
+    import main
+
+    items = read_jsonl(args.input)
+    queries = [item["query"] for item in items]
+    # Os avisos do backend vão para stderr, para não misturar com o JSONL
+    with redirect_stdout(sys.stderr):
+        async with main.lifespan(main.app):
+            await main.app.state.warm.wait()
+            results = await answer_batch(
+                queries, main.batch_answer, args.concurrency, main.quick_answer
+            )
+
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for item, result in zip(items, results):
+            output.write(json.dumps({**item, **result}, ensure_ascii=False) + "\n")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+def cli() -> None:
+    parser = argparse.ArgumentParser(
+        description="Responde um arquivo JSONL de perguntas em lote."
+    )
+    parser.add_argument("input", help="arquivo JSONL com as perguntas")
+    parser.add_argument(
+        "--output", help="arquivo JSONL de saída (padrão: saída padrão)"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=BATCH_LLM_CONCURRENCY,
+        help="chamadas simultâneas ao LLM",
+    )
+    args = parser.parse_args()
+    asyncio.run(run_file(args))
+
+
+if __name__ == "__main__":
+    cli()
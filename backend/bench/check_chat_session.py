@@ -0,0 +1,85 @@
+"""Verifica quais mensagens do chat (/ws/chat) herdam o assunto da conversa:
+perguntas de continuação ("e o coach deles?") recebem o último time ou
+jogador citado; cumprimentos, agradecimentos e despedidas nunca.
+
+Uso (a partir de backend/):
+    python -m bench.check_chat_session
+"""
+
+import sys
+
+from data_store import FuriaDataStore
+from session import ChatSession
+
+# Perguntas que definem o assunto da conversa
+OPENERS = [
+    "quem é o kscerato?",
+    "qual o lineup do valorant?",
+    "quem é o coach do lol?",
+    "me fala do FalleN",
+]
+
+# Mensagens seguintes e se devem receber o assunto
+FOLLOW_UPS = [
+    ("e o coach deles?", True),
+    ("qual a função dele?", True),
+    ("e o kda?", True),
+    ("quais as estatísticas?", True),
+    ("e os títulos?", True),
+    ("quem é o técnico?", True),
+    ("e a escalação?", True),
+    ("o que ele faz?", True),
+    ("qual o rating dela?", True),
+]
+SMALL_TALK = [
+    "oi",
+    "olá!",
+    "bom dia",
+    "boa noite",
+    "tudo bem?",
+    "valeu!",
+    "valeu mesmo",
+    "vlw",
+    "obrigado",
+    "obrigada!",
+    "muito obrigado pela ajuda",
+    "brigado",
+    "thanks",
+    "tchau",
+    "até mais",
+    "falou",
+    "flw",
+    "show",
+    "legal",
+    "kkkkk",
+    "top demais",
+    "boa",
+    "ok",
+    "entendi",
+]
+CASES = FOLLOW_UPS + [(message, False) for message in SMALL_TALK]
+
+
+def main() -> int:
+    store = FuriaDataStore()
+    store.reload_if_changed()
+    entities = store.snapshot.entities
+
+    mismatches = 0
+    for opener in OPENERS:
+        for message, expects_topic in CASES:
+            session = ChatSession()
+            session.resolve(opener, entities)
+            resolved = session.resolve(message, entities)
+            if (resolved != message) != expects_topic:
+                mismatches += 1
+                print(f"DIVERGÊNCIA: {opener!r} -> {message!r} virou {resolved!r}")
+
+    print(
+        f"{len(OPENERS) * len(CASES)} mensagens verificadas, {mismatches} divergências."
+    )
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""Verifica se o snapshot montado por apply_patch (índice de busca refeito só
+nas seções alteradas) é igual ao de uma carga completa do arquivo: mesmos
+trechos na mesma ordem, mesmos termos, mesmas seleções de contexto e mesmo
+contexto completo. Também mede o tempo de cada caminho.
+
+Uso (a partir de backend/):
+    python -m bench.check_data_patch
+    python -m bench.check_data_patch --scale 100
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# A carga completa tem que montar tudo do zero, sem ler os artefatos que o
+# próprio apply_patch acabou de gravar
+os.environ["ARTIFACTS_DIR"] = ""
+
+from bench.check_intent_matcher import CORPUS
+from bench.synthetic_data import generate_dataset
+from config import CONTEXT_TOKEN_BUDGET, RETRIEVAL_TOP_K
+from data_store import DataSnapshot, FuriaDataStore
+from retrieval import ROOT
+
+# Alterações aplicadas em sequência sobre o mesmo arquivo: (caminho, valor, remover)
+PATCHES = [
+    # Seções do formato antigo que não existiam (uma reconstrução completa as põe no início)
+    (
+        ("info",),
+        {"sobre": "Organização brasileira de esports", "fundada": "2017"},
+        False,
+    ),
+    (("competicoes",), [{"nome": "IEM Rio Major", "resultado": "Top 8"}], False),
+    (
+        ("times",),
+        {"CS2": {"lineup": ["KSCERATO", "yuurih"], "conquistas": ["ESL Pro League"]}},
+        False,
+    ),
+    (("times", "Valorant"), {"lineup": ["khalil", "havoc"]}, False),
+    (("times", "CS2", "lineup"), ["FalleN", "chelo", "skullz"], False),
+    (("info", "sobre"), "Organização de esports fundada em São Paulo", False),
+    # Seções atuais: alteração, chave nova, jogo e jogador novos
+    (
+        (ROOT, "Valorant", "lineup"),
+        ["khalil", "havoc", "heat", "raafa", "mwzera"],
+        False,
+    ),
+    ((ROOT, "Counter_Strike_2", "players_bio"), {"FalleN": "Capitão e AWPer."}, False),
+    (
+        (ROOT, "statistics", "League_of_Legends"),
+        {"Tutsz": {"kda": "3.10", "cs_per_min": 8.9}},
+        False,
+    ),
+    (
+        (ROOT, "statistics", "Counter-Strike", "yuurih"),
+        {"rating": 1.1, "kd_ratio": 1.12},
+        False,
+    ),
+    (
+        (ROOT, "historical_titles", "Valorant"),
+        [{"year": 2024, "title": "Challengers Brasil"}],
+        False,
+    ),
+    ((ROOT, "new_section"), {"fan_club": {"members": 1000}}, False),
+    # Remoções e uma seção removida que volta (no fim do arquivo)
+    ((ROOT, "branding"), None, True),
+    ((ROOT, "branding"), {"uniform": {"primary_color": "azul"}}, False),
+    ((ROOT, "Valorant", "notes"), None, True),
+    ((ROOT, "statistics", "Valorant"), None, True),
+    ((ROOT, "historical_titles"), None, True),
+    (("times", "Valorant"), None, True),
+    (("info",), None, True),
+    ((ROOT, "statistics"), None, True),
+]
+
+
+def differences(patched: DataSnapshot, reloaded: DataSnapshot, queries):
+    if patched.version != reloaded.version:
+        yield "versão"
+    if patched.context != reloaded.context:
+        yield "contexto completo"
+    if patched.index.chunks != reloaded.index.chunks:
+        yield "trechos (ou a ordem deles) do índice"
+    elif patched.index.dump() != reloaded.index.dump():
+        yield "termos contados do índice"
+    for query in queries:
+        expected = reloaded.index.select(query, RETRIEVAL_TOP_K, CONTEXT_TOKEN_BUDGET)
+        actual = patched.index.select(query, RETRIEVAL_TOP_K, CONTEXT_TOKEN_BUDGET)
+        if expected != actual:
+            yield f"contexto selecionado para {query!r}"
+            break
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scale", type=int, default=1, help="escala do dataset sintético"
+    )
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="furia-patch-")
+    data_path = os.path.join(work_dir, "furia_esports.json")
+    with open(data_path, "w", encoding="utf-8") as file:
+        json.dump(generate_dataset(args.scale), file, ensure_ascii=False, indent=2)
+
+    mismatches = 0
+    patch_seconds = reload_seconds = 0.0
+    try:
+        store = FuriaDataStore(data_path)
+        store.reload_if_changed()
+        for path, value, delete in PATCHES:
+            start = time.perf_counter()
+            patched = store.apply_patch(path, value, delete)
+            patch_seconds += time.perf_counter() - start
+
+            start = time.perf_counter()
+            fresh = FuriaDataStore(data_path)
+            fresh.reload_if_changed()
+            reload_seconds += time.perf_counter() - start
+
+            # Perguntas reais e os títulos dos trechos, que empatam com frequência
+            queries = CORPUS + [
+                chunk.text.split(":")[0] for chunk in fresh.snapshot.index.chunks[:200]
+            ]
+            for difference in differences(patched, fresh.snapshot, queries):
+                mismatches += 1
+                print(
+                    f"DIVERGÊNCIA após {'remover' if delete else 'alterar'} "
+                    f"{'.'.join(path)}: {difference}"
+                )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"{len(PATCHES)} alterações verificadas, {mismatches} divergências.")
+    print(f"apply_patch: {patch_seconds / len(PATCHES) * 1000:.1f} ms por alteração")
+    print(
+        f"carga completa: {reload_seconds / len(PATCHES) * 1000:.1f} ms por alteração"
+    )
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
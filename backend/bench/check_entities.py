@@ -0,0 +1,110 @@
+"""Verifica a busca de nomes do índice de entidades (entities.py): apelidos
+com erros de digitação comuns encontram o jogador certo, palavras comuns das
+perguntas não viram nomes, e as respostas diretas saem para as perguntas com
+erro de digitação.
+
+Uso (a partir de backend/):
+    python -m bench.check_entities
+"""
+
+import sys
+
+from bench.check_chat_session import FOLLOW_UPS, SMALL_TALK
+from bench.check_intent_matcher import CORPUS
+from bench.check_retrieval import EXPECTED
+from cache import normalize_query
+from data_store import FuriaDataStore
+
+# Erro de digitação -> nome no índice
+TYPOS = {
+    "kserato": "kscerato",
+    "kscerto": "kscerato",
+    "kcerato": "kscerato",
+    "fallem": "fallen",
+    "falen": "fallen",
+    "raffa": "raafa",
+    "rafa": "raafa",
+    "pryse": "pryze",
+    "tutz": "tutsz",
+    "tutsy": "tutsz",
+    "jojoo": "jojo",
+    "yurih": "yuurih",
+    "yuuri": "yuurih",
+    "khalill": "khalil",
+    "havok": "havoc",
+    "skulz": "skullz",
+    "skullzz": "skullz",
+    "chello": "chelo",
+    "gigo": "guigo",
+    "innershine": "innersh1ne",
+    "thinkard": "thinkcard",
+}
+
+# Palavras que não podem virar nomes
+NOT_NAMES = [
+    "head",
+    "lose",
+    "less",
+    "swap",
+    "seat",
+    "tudo",
+    "time",
+    "joga",
+    "ela",
+    "ele",
+    "lol",
+    "kda",
+]
+
+# Perguntas com erro de digitação e um trecho que a resposta direta precisa ter
+ANSWERS = [
+    ("kda do tutz", "Tutsz"),
+    ("qual o rating do kserato?", "KSCERATO"),
+    ("quem é o fallem?", "FalleN"),
+    ("acs do raffa", "raafa"),
+    ("qual a função do jojoo?", "JoJo"),
+    ("quem é o head coach do lol?", "Thinkcard"),
+    ("quem é o head coach do cs?", "sidde"),
+]
+
+
+def main() -> int:
+    store = FuriaDataStore()
+    store.reload_if_changed()
+    entities = store.snapshot.entities
+
+    mismatches = 0
+    for word, expected in TYPOS.items():
+        found = entities.lookup_name(word)
+        if found != expected:
+            mismatches += 1
+            print(f"DIVERGÊNCIA: {word!r} -> {found!r} (esperado {expected!r})")
+
+    # Palavras das perguntas dos outros corpora (sem os próprios nomes)
+    texts = CORPUS + [query for query, _ in EXPECTED + FOLLOW_UPS] + SMALL_TALK
+    words = {word for text in texts for word in normalize_query(text).split()} | set(
+        NOT_NAMES
+    )
+    words -= set(entities.players) | set(entities.staff)
+    for word in sorted(words):
+        found = entities.lookup_name(word)
+        if found is not None and word not in TYPOS:
+            mismatches += 1
+            print(f"DIVERGÊNCIA: {word!r} virou o nome {found!r}")
+
+    for query, expected in ANSWERS:
+        answer = entities.answer(query)
+        if answer is None or expected not in answer:
+            mismatches += 1
+            print(
+                f"DIVERGÊNCIA: {query!r}\n  resposta: {answer!r}\n  esperado: ...{expected}..."
+            )
+
+    print(
+        f"{len(TYPOS) + len(words) + len(ANSWERS)} casos verificados, {mismatches} divergências."
+    )
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
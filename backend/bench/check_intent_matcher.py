@@ -0,0 +1,171 @@
+"""Verifica se o matcher compilado do fallback dá os mesmos resultados da
+implementação original (um re.search por padrão) e mede o ganho de tempo.
+
+Uso (a partir de backend/):
+    python -m bench.check_intent_matcher
+"""
+
+import itertools
+import random
+import re
+import sys
+import time
+
+from fallback import (
+    INTENT_PATTERNS,
+    KNOWLEDGE_BASE,
+    advanced_fallback_response,
+    match_intents,
+)
+
+# Perguntas reais e variações comuns dos fãs
+CORPUS = [
+    "",
+    "oi",
+    "Olá!",
+    "e aí, beleza?",
+    "salve",
+    "tudo bem",
+    "obrigado",
+    "valeu!",
+    "vlw mano",
+    "tchau",
+    "até mais",
+    "flw",
+    "qual o lineup de cs2?",
+    "Qual o line up do CS?",
+    "quem joga no counter strike?",
+    "quem são os jogadores de cs2",
+    "quem é o coach do valorant?",
+    "quem treina o time de lol?",
+    "qual o técnico do cs",
+    "comissão técnica do league of legends",
+    "quais as conquistas da furia no cs2?",
+    "títulos do valorant",
+    "o time de lol ganhou alguma coisa?",
+    "quais campeonatos o valorant disputa?",
+    "competições de cs",
+    "quem é o kscerato?",
+    "FalleN ainda joga?",
+    "me fala do yuurih",
+    "como foi o cs no último campeonato?",
+    "resultado recente do counter",
+    "qual a próxima competição do lol?",
+    "como está o league of legends?",
+    "quem é o ayu",
+    "tutsz é bom?",
+    "mudanças no time de cs",
+    "houve trocas no lol?",
+    "qual era o time anterior de lol?",
+    "lineup de 2024 do league",
+    "elenco do valorant",
+    "academy de valorant",
+    "time base do val",
+    "heat é bom?",
+    "e o raafa?",
+    "o que aconteceu com o mwzera?",
+    "qual a história da furia?",
+    "quando a furia foi fundada?",
+    "quem fundou a pantera?",
+    "qual a cor do uniforme?",
+    "qual o mascote?",
+    "a furia joga outros jogos?",
+    "furia tem time de rocket league?",
+    "e o r6?",
+    "rainbow six siege",
+    "fps",
+    "moba",
+    "intervalo",
+    "quero saber sobre a furia",
+    "qual o melhor jogador?",
+    "counter-strike 2",
+    "valorant\ncs2",
+    "linha 1\noi",
+    "COACH DO CS2 E DO VALORANT E DO LOL",
+    "obrigado pelo lineup do cs, tchau",
+]
+
+
+# Implementação original: um re.search por padrão, na ordem da tabela
+def legacy_match_intents(query: str):
+    query_lower = query.lower()
+    matched_intents = []
+    for intent, patterns in INTENT_PATTERNS.items():
+        for pattern in patterns:
+            if re.search(pattern, query_lower):
+                matched_intents.append(intent)
+                break
+    return matched_intents
+
+
+def legacy_fallback_response(query: str) -> str:
+    query_lower = query.lower()
+    responses = [
+        KNOWLEDGE_BASE[intent]
+        for intent in legacy_match_intents(query)
+        if intent in KNOWLEDGE_BASE
+    ]
+    if not responses:
+        if any(
+            keyword in query_lower
+            for keyword in ["cs", "cs2", "counter", "counter-strike", "fps"]
+        ):
+            responses.append(KNOWLEDGE_BASE["cs2_lineup"])
+        elif any(
+            keyword in query_lower for keyword in ["lol", "league", "legends", "moba"]
+        ):
+            responses.append(KNOWLEDGE_BASE["lol_lineup"])
+        elif any(keyword in query_lower for keyword in ["val", "valorant"]):
+            responses.append(KNOWLEDGE_BASE["valorant_lineup"])
+        else:
+            responses.append(KNOWLEDGE_BASE["default"])
+    return " ".join(responses[:2])
+
+
+# Frases geradas combinando palavras que aparecem nos padrões
+def generated_corpus(size: int, seed: int = 2025):
+    words = set()
+    for patterns in INTENT_PATTERNS.values():
+        for pattern in patterns:
+            words.update(re.findall(r"[^\W\d_]+\d*", pattern))
+    words.update(["quem", "qual", "o", "a", "de", "do", "da", "furia", "?", "!", "2"])
+    vocabulary = sorted(words)
+    rng = random.Random(seed)
+    for _ in range(size):
+        yield " ".join(rng.choice(vocabulary) for _ in range(rng.randint(1, 8)))
+
+
+def main() -> int:
+    corpus = CORPUS + list(generated_corpus(5000))
+    # Também combina pares de perguntas reais
+    corpus += [f"{a} {b}" for a, b in itertools.permutations(CORPUS[:30], 2)]
+
+    mismatches = 0
+    for query in corpus:
+        expected = legacy_match_intents(query)
+        actual = match_intents(query)
+        if expected != actual or legacy_fallback_response(
+            query
+        ) != advanced_fallback_response(query):
+            mismatches += 1
+            print(
+                f"DIVERGÊNCIA: {query!r}\n  original: {expected}\n  compilado: {actual}"
+            )
+
+    print(f"{len(corpus)} perguntas verificadas, {mismatches} divergências.")
+
+    for name, function in (
+        ("original", legacy_fallback_response),
+        ("compilado", advanced_fallback_response),
+    ):
+        start = time.perf_counter()
+        for query in corpus:
+            function(query)
+        elapsed = time.perf_counter() - start
+        print(f"{name}: {elapsed / len(corpus) * 1e6:.1f} µs por pergunta")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""Verifica se a busca do contexto (retrieval.py) seleciona, para perguntas
+comuns dos fãs, o trecho do dataset que tem a resposta. Com o contexto
+reduzido, um trecho que fica de fora não chega ao prompt.
+
+Uso (a partir de backend/):
+    python -m bench.check_retrieval
+"""
+
+import sys
+
+from config import CONTEXT_TOKEN_BUDGET, RETRIEVAL_TOP_K
+from data_store import FuriaDataStore
+from retrieval import ROOT
+
+# Pergunta -> caminho do trecho que precisa estar no contexto
+EXPECTED = [
+    (
+        "qual o próximo campeonato do lol?",
+        (ROOT, "League_of_Legends", "latest_competition"),
+    ),
+    (
+        "qual o próximo torneio da furia no lol",
+        (ROOT, "League_of_Legends", "latest_competition"),
+    ),
+    (
+        "qual campeonato o lol vai jogar?",
+        (ROOT, "League_of_Legends", "latest_competition"),
+    ),
+    ("quando começa a LTA Sul?", (ROOT, "League_of_Legends", "latest_competition")),
+    (
+        "em quais competições o lol está?",
+        (ROOT, "League_of_Legends", "latest_competition"),
+    ),
+    (
+        "qual foi a última competição do cs?",
+        (ROOT, "Counter_Strike_2", "latest_competition"),
+    ),
+    ("qual o último torneio do cs2?", (ROOT, "Counter_Strike_2", "latest_competition")),
+    (
+        "como a furia foi no último campeonato de cs?",
+        (ROOT, "Counter_Strike_2", "latest_competition"),
+    ),
+    ("qual o lineup do cs?", (ROOT, "Counter_Strike_2", "lineup")),
+    ("quem joga no valorant da furia?", (ROOT, "Valorant", "lineup")),
+    ("quem é o técnico do lol?", (ROOT, "League_of_Legends", "coaching_staff")),
+    ("quem treina o valorant?", (ROOT, "Valorant", "coaching_staff")),
+    (
+        "qual era o lineup anterior do lol?",
+        (ROOT, "League_of_Legends", "previous_lineup_CBLOL_2024"),
+    ),
+    (
+        "quem são os jogadores do academy de valorant?",
+        (ROOT, "Valorant", "academy_team"),
+    ),
+    ("qual o rating do KSCERATO?", (ROOT, "statistics", "Counter-Strike", "KSCERATO")),
+    ("estatísticas do heat", (ROOT, "statistics", "Valorant", "heat")),
+    (
+        "quais títulos a furia ganhou no cs?",
+        (ROOT, "historical_titles", "Counter-Strike"),
+    ),
+    ("quais as cores do uniforme da furia?", (ROOT, "branding", "uniform")),
+    (
+        "a furia ainda joga rainbow six?",
+        (ROOT, "other_modalities", "Rainbow Six Siege"),
+    ),
+]
+
+
+def main() -> int:
+    store = FuriaDataStore()
+    store.reload_if_changed()
+    index = store.snapshot.index
+
+    misses = 0
+    for query, path in EXPECTED:
+        selected = [
+            chunk.path
+            for chunk in index.select(query, RETRIEVAL_TOP_K, CONTEXT_TOKEN_BUDGET)
+        ]
+        if path not in selected:
+            misses += 1
+            print(
+                f"FALTOU: {query!r}\n  esperado: {'.'.join(path)}\n"
+                f"  selecionado: {['.'.join(p) for p in selected]}"
+            )
+
+    print(f"{len(EXPECTED)} perguntas verificadas, {misses} sem o trecho esperado.")
+    return 1 if misses else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
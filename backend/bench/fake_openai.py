@@ -0,0 +1,130 @@
+"""Servidor local compatível com a API de chat da OpenAI, para benchmarks offline.
+
+Responde em /v1/chat/completions (com e sem stream) com latência e taxa de
+erro configuráveis. Aponte o backend para ele com OPENAI_BASE_URL.
+
+Uso (a partir de backend/):
+    python -m bench.fake_openai --port 9999 --latency 0.3 --jitter 0.1 --error-rate 0.02
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# Configuração via ambiente, para funcionar também com "uvicorn bench.fake_openai:app"
+LATENCY = float(os.environ.get("FAKE_OPENAI_LATENCY", "0.3"))
+JITTER = float(os.environ.get("FAKE_OPENAI_JITTER", "0.0"))
+ERROR_RATE = float(os.environ.get("FAKE_OPENAI_ERROR_RATE", "0.0"))
+TOKEN_DELAY = float(os.environ.get("FAKE_OPENAI_TOKEN_DELAY", "0.01"))
+
+app = FastAPI()
+
+
+def _answer_for(body: dict) -> str:
+    question = body["messages"][-1]["content"]
+    return f"Resposta simulada da FURIA para: {question} #GoFURIA"
+
+
+def _chunk(model: str, content: str, finish_reason=None) -> str:
+    payload = {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {"index": 0, "delta": {"content": content}, "finish_reason": finish_reason}
+        ],
+    }
+    return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    model = body.get("model", "fake")
+
+    delay = max(0.0, random.gauss(LATENCY, JITTER)) if JITTER else LATENCY
+    await asyncio.sleep(delay)
+
+    if random.random() < ERROR_RATE:
+        return JSONResponse(
+            status_code=500,
+            content={"error": {"message": "erro simulado", "type": "server_error"}},
+        )
+
+    answer = _answer_for(body)
+    if body.get("stream"):
+
+        async def events():
+            for word in answer.split(" "):
+                yield _chunk(model, word + " ")
+                if TOKEN_DELAY:
+                    await asyncio.sleep(TOKEN_DELAY)
+            yield _chunk(model, "", finish_reason="stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    prompt_tokens = sum(len(message["content"]) for message in body["messages"]) // 4
+    completion_tokens = len(answer) // 4
+    return {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": answer},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def main() -> None:
+    global LATENCY, JITTER, ERROR_RATE, TOKEN_DELAY
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9999)
+    parser.add_argument(
+        "--latency", type=float, default=LATENCY, help="latência média (s)"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=JITTER, help="desvio padrão da latência (s)"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=ERROR_RATE, help="fração de respostas 500"
+    )
+    parser.add_argument(
+        "--token-delay",
+        type=float,
+        default=TOKEN_DELAY,
+        help="intervalo entre tokens no stream (s)",
+    )
+    args = parser.parse_args()
+
+    LATENCY, JITTER, ERROR_RATE, TOKEN_DELAY = (
+        args.latency,
+        args.jitter,
+        args.error_rate,
+        args.token_delay,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
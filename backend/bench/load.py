@@ -0,0 +1,255 @@
+"""Teste de carga do /query (ou /query/stream) com requisições concorrentes.
+
+Sem --url, sobe localmente o servidor OpenAI simulado (bench.fake_openai) e o
+backend apontando para ele, tudo offline. Reporta latência p50/p95/p99 e
+requisições por segundo.
+
+Uso (a partir de backend/):
+    python -m bench.load --requests 2000 --concurrency 100 --distinct 50
+    python -m bench.load --endpoint /query/stream --latency 0.5 --error-rate 0.05
+    python -m bench.load --url http://localhost:8000 --requests 500
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+import httpx
+
+from bench.micro import QUESTIONS
+from bench.synthetic_data import generate_dataset
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"Servidor não respondeu em {url}")
+
+
+# Sobe o OpenAI simulado e o backend em subprocessos; retorna a URL do backend
+@contextmanager
+def local_stack(args: argparse.Namespace) -> Iterator[str]:
+    fake_port, app_port = free_port(), free_port()
+    processes: List[subprocess.Popen] = []
+    data_file = None
+    env = dict(os.environ)
+    env.update(
+        FAKE_OPENAI_LATENCY=str(args.latency),
+        FAKE_OPENAI_JITTER=str(args.jitter),
+        FAKE_OPENAI_ERROR_RATE=str(args.error_rate),
+        OPENAI_API_KEY="chave-falsa",
+        OPENAI_BASE_URL=f"http://127.0.0.1:{fake_port}/v1",
+        LLM_BACKEND="openai",
+    )
+    for item in args.env:
+        key, _, value = item.partition("=")
+        env[key] = value
+    if args.scale > 1:
+        data_file = tempfile.NamedTemporaryFile(
+            "w", suffix=".json", delete=False, encoding="utf-8"
+        )
+        json.dump(generate_dataset(args.scale), data_file, ensure_ascii=False)
+        data_file.close()
+        env["FURIA_DATA_PATH"] = data_file.name
+
+    def start(module: str, port: int) -> None:
+        command = [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            module,
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ]
+        if module == "main:app" and args.workers > 1:
+            command += ["--workers", str(args.workers)]
+        processes.append(subprocess.Popen(command, cwd=BACKEND_DIR, env=env))
+
+    try:
+        start("bench.fake_openai:app", fake_port)
+        start("main:app", app_port)
+        wait_until_up(f"http://127.0.0.1:{app_port}/ready")
+        yield f"http://127.0.0.1:{app_port}"
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=10)
+        if data_file is not None:
+            os.unlink(data_file.name)
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def build_questions(total: int, distinct: int) -> List[str]:
+    base = QUESTIONS * (distinct // len(QUESTIONS) + 1)
+    # Variações numeradas geram chaves de cache diferentes
+    pool = [
+        q if i < len(QUESTIONS) else f"{q} ({i})" for i, q in enumerate(base[:distinct])
+    ]
+    return [pool[i % len(pool)] for i in range(total)]
+
+
+async def run_load(url: str, args: argparse.Namespace) -> Dict[str, object]:
+    questions = build_questions(args.requests, args.distinct)
+    latencies: List[float] = []
+    first_bytes: List[float] = []
+    errors = 0
+    queue: "asyncio.Queue[str]" = asyncio.Queue()
+    for question in questions:
+        queue.put_nowait(question)
+
+    limits = httpx.Limits(
+        max_connections=args.concurrency, max_keepalive_connections=args.concurrency
+    )
+    async with httpx.AsyncClient(
+        base_url=url, limits=limits, timeout=args.timeout
+    ) as client:
+
+        async def worker() -> None:
+            nonlocal errors
+            while True:
+                try:
+                    question = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                start = time.perf_counter()
+                first_byte: Optional[float] = None
+                try:
+                    async with client.stream(
+                        "POST", args.endpoint, json={"query": question}
+                    ) as response:
+                        async for _ in response.aiter_bytes():
+                            if first_byte is None:
+                                first_byte = time.perf_counter() - start
+                        if response.status_code != 200:
+                            errors += 1
+                            continue
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - start)
+                if first_byte is not None:
+                    first_bytes.append(first_byte)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "endpoint": args.endpoint,
+        "requests": len(questions),
+        "concurrency": args.concurrency,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {
+            name: round(percentile(latencies, fraction) * 1000, 1)
+            for name, fraction in (
+                ("p50", 0.50),
+                ("p95", 0.95),
+                ("p99", 0.99),
+                ("max", 1.0),
+            )
+        },
+        "first_byte_ms": {
+            name: round(percentile(first_bytes, fraction) * 1000, 1)
+            for name, fraction in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99))
+        },
+    }
+
+
+def print_report(report: Dict[str, object]) -> None:
+    print(
+        f"{report['requests']} requisições em {report['endpoint']} "
+        f"(concorrência {report['concurrency']}): {report['seconds']} s, "
+        f"{report['rps']} req/s, {report['errors']} erros"
+    )
+    print(
+        "  latência (ms):      "
+        + "  ".join(f"{k}={v}" for k, v in report["latency_ms"].items())
+    )
+    print(
+        "  primeiro byte (ms): "
+        + "  ".join(f"{k}={v}" for k, v in report["first_byte_ms"].items())
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="backend já em execução (senão sobe um local)")
+    parser.add_argument(
+        "--endpoint", default="/query", choices=["/query", "/query/stream"]
+    )
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument(
+        "--distinct", type=int, default=50, help="quantidade de perguntas diferentes"
+    )
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument(
+        "--json", action="store_true", help="imprime o resultado em JSON"
+    )
+    local = parser.add_argument_group("ambiente local (sem --url)")
+    local.add_argument(
+        "--latency", type=float, default=0.3, help="latência do OpenAI simulado (s)"
+    )
+    local.add_argument("--jitter", type=float, default=0.05)
+    local.add_argument("--error-rate", type=float, default=0.0)
+    local.add_argument(
+        "--scale", type=int, default=1, help="escala do dataset sintético"
+    )
+    local.add_argument("--workers", type=int, default=1, help="workers do uvicorn")
+    local.add_argument(
+        "--env",
+        action="append",
+        default=[],
+        metavar="CHAVE=VALOR",
+        help="variável extra para o backend (ex.: LLM_HEDGE_AFTER=0.5)",
+    )
+    args = parser.parse_args()
+
+    if args.url:
+        report = asyncio.run(run_load(args.url.rstrip("/"), args))
+    else:
+        with local_stack(args) as url:
+            report = asyncio.run(run_load(url, args))
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Microbenchmarks do pipeline de perguntas: matcher do fallback, respostas
+diretas do índice de entidades, montagem do contexto (completo e por
+recuperação) e normalização da chave do cache.
+O custo do contexto é medido em várias escalas do dataset sintético.
+
+Uso (a partir de backend/):
+    python -m bench.micro --scales 1 10 100
+"""
+
+import argparse
+import json
+import timeit
+from typing import Callable, List
+
+from bench.check_intent_matcher import CORPUS
+from bench.synthetic_data import generate_dataset
+from cache import normalize_query
+from config import CONTEXT_TOKEN_BUDGET, RETRIEVAL_TOP_K
+from data_store import generate_context
+from entities import EntityIndex
+from fallback import advanced_fallback_response, match_intents
+from retrieval import RetrievalIndex, estimate_tokens
+
+QUESTIONS = [
+    "qual o lineup de cs2?",
+    "quem é o coach do valorant?",
+    "quais os títulos do lol?",
+    "qual o kd do fallen?",
+    "me fala da história da furia",
+]
+
+
+# Tempo médio por chamada (melhor de 3 rodadas de ~0,2 s cada)
+def time_per_call(function: Callable[[], object], repeat: int = 3) -> float:
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def over(items: List[str], function: Callable[[str], object]) -> Callable[[], None]:
+    def run() -> None:
+        for item in items:
+            function(item)
+
+    return run
+
+
+def format_time(seconds: float) -> str:
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:9.1f} µs"
+    return f"{seconds * 1e3:9.2f} ms"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    args = parser.parse_args()
+
+    corpus = [query for query in CORPUS if query]
+    entities = EntityIndex(generate_dataset(1))
+    print("Fallback / cache / respostas diretas (por pergunta)")
+    for name, function in (
+        ("advanced_fallback_response", advanced_fallback_response),
+        ("match_intents", match_intents),
+        ("normalize_query", normalize_query),
+        ("EntityIndex.answer", entities.answer),
+    ):
+        per_query = time_per_call(over(corpus, function)) / len(corpus)
+        print(f"  {name:<28}{format_time(per_query)}")
+
+    print("\nContexto por escala do dataset")
+    header = (
+        f"  {'escala':>6} {'json KB':>8} {'trechos':>8} {'tokens ctx':>10} {'tokens rec':>10}"
+        f" {'generate_context':>17} {'índice BM25':>13} {'build_context':>14}"
+    )
+    print(header)
+    for scale in args.scales:
+        data = generate_dataset(scale)
+        size_kb = len(json.dumps(data, ensure_ascii=False).encode("utf-8")) / 1024
+        full_context = generate_context(data)
+        index = RetrievalIndex.from_data(data)
+        retrieved_tokens = sum(
+            estimate_tokens(
+                index.build_context(q, RETRIEVAL_TOP_K, CONTEXT_TOKEN_BUDGET)
+            )
+            for q in QUESTIONS
+        ) // len(QUESTIONS)
+
+        context_time = time_per_call(lambda: generate_context(data))
+        index_time = time_per_call(lambda: RetrievalIndex.from_data(data), repeat=1)
+        retrieval_time = time_per_call(
+            over(
+                QUESTIONS,
+                lambda q: index.build_context(q, RETRIEVAL_TOP_K, CONTEXT_TOKEN_BUDGET),
+            )
+        ) / len(QUESTIONS)
+
+        print(
+            f"  {scale:>6} {size_kb:>8.1f} {len(index.chunks):>8}"
+            f" {estimate_tokens(full_context):>10}"
+            f" {retrieved_tokens:>10} {format_time(context_time):>17} {format_time(index_time):>13}"
+            f" {format_time(retrieval_time):>14}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""Tempo de inicialização do backend: do início do processo até o /health
+(processo no ar), até o /ready (pronto para tráfego) e até a primeira resposta.
+
+Sobe o OpenAI simulado (bench.fake_openai) uma vez e reinicia o backend a
+cada rodada, tudo offline. Com --cold, cada rodada usa um diretório de
+artefatos vazio (como um container novo); sem ele, a partir da segunda rodada
+o dataset é lido dos artefatos já gravados (como um reinício).
+
+Uso (a partir de backend/):
+    python -m bench.startup --runs 5
+    python -m bench.startup --runs 5 --cold --scale 100
+    python -m bench.startup --backend stub
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from bench.load import BACKEND_DIR, free_port
+from bench.synthetic_data import generate_dataset
+
+POLL_INTERVAL = 0.005
+
+
+# Segundos desde `started` até a URL responder 200
+def time_until_ok(
+    client: httpx.Client, url: str, started: float, timeout: float
+) -> float:
+    deadline = started + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if client.get(url).status_code == 200:
+                return time.perf_counter() - started
+        except httpx.HTTPError:
+            pass
+        time.sleep(POLL_INTERVAL)
+    raise RuntimeError(f"{url} não respondeu 200 em {timeout} s")
+
+
+# Esperar o servidor aceitar conexões (qualquer status HTTP serve)
+def wait_for_server(url: str, timeout: float) -> None:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(POLL_INTERVAL)
+    raise RuntimeError(f"Servidor não respondeu em {url}")
+
+
+def measure_run(env: Dict[str, str], port: int, timeout: float) -> Dict[str, float]:
+    base = f"http://127.0.0.1:{port}"
+    command = [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "main:app",
+        "--port",
+        str(port),
+        "--log-level",
+        "warning",
+    ]
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        command, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL
+    )
+    try:
+        with httpx.Client(timeout=timeout) as client:
+            health = time_until_ok(client, f"{base}/health", started, timeout)
+            ready = time_until_ok(client, f"{base}/ready", started, timeout)
+            steps = client.get(f"{base}/ready").json()["startup_ms"]
+            query_started = time.perf_counter()
+            client.post(
+                f"{base}/query", json={"query": "me conta sobre a FURIA"}
+            ).raise_for_status()
+            first_query = time.perf_counter() - query_started
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+    return {
+        "health_ms": health * 1000,
+        "ready_ms": ready * 1000,
+        "first_query_ms": first_query * 1000,
+        **steps,
+    }
+
+
+def summarize(runs: List[Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+    names = [name for name in runs[0] if all(name in run for run in runs)]
+    return {
+        name: {
+            "min": round(min(run[name] for run in runs), 1),
+            "median": round(statistics.median(run[name] for run in runs), 1),
+            "max": round(max(run[name] for run in runs), 1),
+        }
+        for name in names
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--backend", default="openai", choices=["openai", "stub"])
+    parser.add_argument(
+        "--scale", type=int, default=1, help="escala do dataset sintético"
+    )
+    parser.add_argument(
+        "--cold",
+        action="store_true",
+        help="sem artefatos pré-calculados em todas as rodadas",
+    )
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument(
+        "--json", action="store_true", help="imprime o resultado em JSON"
+    )
+    args = parser.parse_args()
+
+    fake_port = free_port()
+    work_dir = tempfile.mkdtemp(prefix="furia-startup-")
+    env = dict(os.environ)
+    env.update(
+        FAKE_OPENAI_LATENCY="0",
+        OPENAI_API_KEY="chave-falsa",
+        OPENAI_BASE_URL=f"http://127.0.0.1:{fake_port}/v1",
+        LLM_BACKEND=args.backend,
+        ARTIFACTS_DIR=os.path.join(work_dir, "artifacts"),
+    )
+    if args.scale > 1:
+        data_path = os.path.join(work_dir, "furia_esports.json")
+        with open(data_path, "w", encoding="utf-8") as file:
+            json.dump(generate_dataset(args.scale), file, ensure_ascii=False)
+        env["FURIA_DATA_PATH"] = data_path
+
+    fake: Optional[subprocess.Popen] = None
+    runs: List[Dict[str, float]] = []
+    try:
+        command = [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "bench.fake_openai:app",
+            "--port",
+            str(fake_port),
+            "--log-level",
+            "warning",
+        ]
+        fake = subprocess.Popen(command, cwd=BACKEND_DIR, env=env)
+        wait_for_server(f"http://127.0.0.1:{fake_port}/", args.timeout)
+        for _ in range(args.runs):
+            if args.cold:
+                shutil.rmtree(env["ARTIFACTS_DIR"], ignore_errors=True)
+            runs.append(measure_run(env, free_port(), args.timeout))
+    finally:
+        if fake is not None:
+            fake.terminate()
+            fake.wait(timeout=10)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = summarize(runs)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False))
+        return
+    print(
+        f"Inicialização do backend ({args.runs} rodadas, backend {args.backend}, "
+        f"escala {args.scale}, artefatos {'vazios' if args.cold else 'reaproveitados'}), em ms:"
+    )
+    for name, values in report.items():
+        print(
+            f"  {name:<16} "
+            + "  ".join(f"{key}={value}" for key, value in values.items())
+        )
+
+
+if __name__ == "__main__":
+    main()
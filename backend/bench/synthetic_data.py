@@ -0,0 +1,123 @@
+"""Gera versões maiores do furia_esports.json para medir como o custo cresce
+com o tamanho do dataset.
+
+A escala 1 equivale ao arquivo real; a escala N adiciona N-1 cópias de cada
+time (com nomes de jogadores diferentes), mais títulos e estatísticas.
+
+Uso (a partir de backend/):
+    python -m bench.synthetic_data --scale 50 --output /tmp/furia_50.json
+"""
+
+import argparse
+import copy
+import json
+import os
+import random
+from typing import Any, Dict
+
+SOURCE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "data", "furia_esports.json"
+)
+
+GAMES = ["League_of_Legends", "Counter_Strike_2", "Valorant"]
+STAT_GAMES = {
+    "League_of_Legends": "League_of_Legends",
+    "Counter_Strike_2": "Counter-Strike",
+    "Valorant": "Valorant",
+}
+
+
+def load_base_dataset() -> Dict[str, Any]:
+    with open(SOURCE_PATH, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def _player_name(rng: random.Random) -> str:
+    syllables = ["ka", "ze", "ro", "mi", "tu", "xi", "lo", "va", "ne", "ph", "qu", "sk"]
+    return "".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))) + str(
+        rng.randint(1, 99)
+    )
+
+
+def _stats(game: str, rng: random.Random) -> Dict[str, Any]:
+    if game == "Counter-Strike":
+        return {
+            "rating": round(rng.uniform(0.8, 1.3), 2),
+            "entry_kills_per_round": round(rng.uniform(0.05, 0.2), 2),
+            "kd_ratio": round(rng.uniform(0.8, 1.4), 2),
+        }
+    if game == "Valorant":
+        return {
+            "acs": rng.randint(150, 280),
+            "kda": f"{rng.uniform(0.8, 1.6):.2f}",
+            "headshot_percentage": f"{rng.randint(15, 35)}%",
+        }
+    return {
+        "kda": f"{rng.uniform(2, 7):.1f}",
+        "kill_participation": f"{rng.randint(50, 80)}%",
+        "dpm": rng.randint(300, 700),
+    }
+
+
+# Gerar um dataset com o formato do arquivo real, multiplicado pela escala
+def generate_dataset(scale: int, seed: int = 2025) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    data = load_base_dataset()
+    root = data["FURIA_Esports_2025"]
+
+    for copy_index in range(2, scale + 1):
+        for game in GAMES:
+            team = copy.deepcopy(root[game])
+            lineup = team["lineup"]
+            if isinstance(lineup, dict):
+                team["lineup"] = {role: _player_name(rng) for role in lineup}
+                players = list(team["lineup"].values())
+            else:
+                team["lineup"] = [_player_name(rng) for _ in lineup]
+                players = team["lineup"]
+            team.get("coaching_staff", {})["head_coach"] = _player_name(rng)
+            if "players_bio" in team:
+                team["players_bio"] = {
+                    player: f"Jogador {player} do time {copy_index}."
+                    for player in players
+                }
+            root[f"{game}_{copy_index}"] = team
+
+            stat_game = STAT_GAMES[game]
+            stats = root["statistics"].setdefault(f"{stat_game}_{copy_index}", {})
+            for player in players:
+                stats[player] = _stats(stat_game, rng)
+
+            titles = root["historical_titles"].setdefault(
+                f"{stat_game}_{copy_index}", []
+            )
+            for _ in range(rng.randint(1, 4)):
+                titles.append(
+                    {
+                        "year": rng.randint(2018, 2025),
+                        "title": f"Torneio {rng.randint(1, 500)} "
+                        + rng.choice(["Split", "Major", "Masters", "Cup"]),
+                    }
+                )
+
+    return data
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=2025)
+    parser.add_argument("--output", required=True)
+    args = parser.parse_args()
+
+    data = generate_dataset(args.scale, args.seed)
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(data, file, ensure_ascii=False, indent=2)
+    print(
+        f"Dataset com escala {args.scale} salvo em {args.output} "
+        f"({os.path.getsize(args.output)} bytes)"
+    )
+
+
+if __name__ == "__main__":
+    main()
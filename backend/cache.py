@@ -0,0 +1,451 @@
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterator,
+    NamedTuple,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from config import ANSWER_CACHE_SIZE, ANSWER_CACHE_TTL, CACHE_BACKEND, CACHE_PATH
+
+
+# Normalizar a pergunta para que variações triviais usem a mesma entrada do cache:
+# minúsculas, sem acentos, sem pontuação e com espaços simples
+def normalize_query(query: str) -> str:
+    text = unicodedata.normalize("NFKD", query.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(text.split())
+
+
+CacheKey = Tuple[str, str, str]
+# Trechos do dataset usados para gerar a resposta (caminhos no JSON);
+# None quando a resposta depende do dataset inteiro
+Dependencies = Optional[FrozenSet[Tuple[str, ...]]]
+
+
+# Chave do cache: pergunta normalizada + versão dos dados + versão do prompt.
+# Numa alteração parcial dos dados, as entradas não afetadas passam para a
+# nova versão (carry_over) em vez de serem descartadas.
+def make_cache_key(query: str, data_version: str, prompt_version: str) -> CacheKey:
+    return (normalize_query(query), data_version, prompt_version)
+
+
+class _CacheEntry(NamedTuple):
+    answer: str
+    expires_at: float
+    dependencies: Dependencies
+
+
+# Cache de respostas do LLM com limite de tamanho (LRU) e tempo de expiração (TTL)
+class AnswerCache:
+    def __init__(self, max_entries: int = 1024, ttl: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[CacheKey, _CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # Com count=False a consulta não entra nas estatísticas de acertos/erros
+    # (para verificações feitas antes da busca que conta)
+    def get(self, key: CacheKey, count: bool = True) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1 if count else 0
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1 if count else 0
+            return entry.answer
+
+    def set(
+        self, key: CacheKey, answer: str, dependencies: Dependencies = None
+    ) -> None:
+        if self.max_entries <= 0 or not answer:
+            return
+        with self._lock:
+            self._entries[key] = _CacheEntry(
+                answer, time.monotonic() + self.ttl, dependencies
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    # Remover respostas geradas com outra versão dos dados. previous_version é
+    # ignorada: no cache em memória não há outro worker que ainda vá reaproveitar
+    # essas entradas (ver SQLiteAnswerCache.retain_data_version).
+    def retain_data_version(
+        self, data_version: str, previous_version: Optional[str] = None
+    ) -> int:
+        with self._lock:
+            stale = [key for key in self._entries if key[1] != data_version]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    # Passar para new_version as entradas de old_version para as quais
+    # should_drop(chave, dependências) é falso; as demais são removidas. Se a
+    # chave já existe na nova versão, vale a resposta mais nova.
+    # Retorna quantas entradas foram removidas.
+    def carry_over(
+        self,
+        old_version: str,
+        new_version: str,
+        should_drop: Callable[[CacheKey, Dependencies], bool],
+    ) -> int:
+        with self._lock:
+            kept: "OrderedDict[CacheKey, _CacheEntry]" = OrderedDict()
+            for key, entry in self._entries.items():
+                if key[1] == old_version:
+                    new_key = (key[0], new_version, key[2])
+                    if should_drop(key, entry.dependencies) or (
+                        new_key != key and new_key in self._entries
+                    ):
+                        continue
+                    kept[new_key] = entry
+                elif key[1] == new_version:
+                    kept[key] = entry
+            removed = len(self._entries) - len(kept)
+            self._entries = kept
+            return removed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "backend": "memory",
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+# Cache de respostas num arquivo SQLite, compartilhado pelos workers da mesma
+# máquina. Mesma interface do AnswerCache: TTL e limite de entradas, com
+# remoção das menos usadas recentemente. Acertos e erros são contados por
+# processo; erros do SQLite (ex.: banco travado) contam como cache vazio.
+# get e set rodam no event loop, então esperam o banco travado por no máximo
+# `timeout` (poucos ms) e seguem como se fosse um erro; as limpezas, que rodam
+# em threads e não a cada pergunta, esperam até `maintenance_timeout`.
+class SQLiteAnswerCache:
+    # Só atualiza o horário de uso de uma entrada se ele for mais antigo que isso,
+    # para não transformar toda leitura numa escrita
+    TOUCH_INTERVAL = 1.0
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 1024,
+        ttl: float = 3600.0,
+        timeout: float = 0.005,
+        maintenance_timeout: float = 0.5,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.timeout = timeout
+        self.maintenance_timeout = maintenance_timeout
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.errors = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), mode=0o700, exist_ok=True)
+        # isolation_level=None: cada comando é uma transação, exceto os blocos BEGIN/COMMIT
+        self._db = sqlite3.connect(
+            path, timeout=timeout, check_same_thread=False, isolation_level=None
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS answers ("
+            " query TEXT NOT NULL, data_version TEXT NOT NULL, prompt_version TEXT NOT NULL,"
+            " answer TEXT NOT NULL, dependencies TEXT,"
+            " expires_at REAL NOT NULL, used_at REAL NOT NULL,"
+            " UNIQUE (query, data_version, prompt_version))"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS answers_used_at ON answers (used_at)"
+        )
+
+    def _failed(self, error: sqlite3.Error) -> None:
+        self.errors += 1
+        if self.errors == 1:
+            print(f"AVISO: erro no cache SQLite ({self.path}): {error}")
+
+    # Espera mais pelo banco travado durante uma limpeza
+    @contextmanager
+    def _maintenance(self) -> Iterator[None]:
+        self._db.execute(
+            f"PRAGMA busy_timeout = {int(self.maintenance_timeout * 1000)}"
+        )
+        try:
+            yield
+        finally:
+            self._db.execute(f"PRAGMA busy_timeout = {int(self.timeout * 1000)}")
+
+    def get(self, key: CacheKey, count: bool = True) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            try:
+                row = self._db.execute(
+                    "SELECT answer, expires_at, used_at FROM answers"
+                    " WHERE query = ? AND data_version = ? AND prompt_version = ?",
+                    key,
+                ).fetchone()
+            except sqlite3.Error as e:
+                self._failed(e)
+                row = None
+            try:
+                if row is not None and row[1] <= now:
+                    row = None
+                    self._db.execute(
+                        "DELETE FROM answers"
+                        " WHERE query = ? AND data_version = ? AND prompt_version = ?",
+                        key,
+                    )
+                elif row is not None and now - row[2] > self.TOUCH_INTERVAL:
+                    self._db.execute(
+                        "UPDATE answers SET used_at = ?"
+                        " WHERE query = ? AND data_version = ? AND prompt_version = ?",
+                        (now, *key),
+                    )
+            except sqlite3.Error as e:
+                # A leitura deu certo: sem a escrita, só o horário de uso fica antigo
+                self._failed(e)
+            if row is None:
+                self.misses += 1 if count else 0
+                return None
+            self.hits += 1 if count else 0
+            return row[0]
+
+    def set(
+        self, key: CacheKey, answer: str, dependencies: Dependencies = None
+    ) -> None:
+        if self.max_entries <= 0 or not answer:
+            return
+        now = time.time()
+        with self._lock:
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        *key,
+                        answer,
+                        _dump_dependencies(dependencies),
+                        now + self.ttl,
+                        now,
+                    ),
+                )
+                self._db.execute("DELETE FROM answers WHERE expires_at <= ?", (now,))
+                (size,) = self._db.execute("SELECT COUNT(*) FROM answers").fetchone()
+                if size > self.max_entries:
+                    self._db.execute(
+                        "DELETE FROM answers WHERE rowid IN"
+                        " (SELECT rowid FROM answers ORDER BY used_at LIMIT ?)",
+                        (size - self.max_entries,),
+                    )
+                    self.evictions += size - self.max_entries
+            except sqlite3.Error as e:
+                self._failed(e)
+
+    # Remover respostas geradas com outra versão dos dados, exceto a anterior:
+    # quando outro worker altera os dados pela API, este pode recarregar o
+    # arquivo antes de o outro passar as entradas não afetadas para a nova
+    # versão (carry_over). As entradas da versão anterior só são lidas por
+    # workers que ainda estão nela e saem pela remoção das menos usadas.
+    def retain_data_version(
+        self, data_version: str, previous_version: Optional[str] = None
+    ) -> int:
+        with self._lock:
+            try:
+                with self._maintenance():
+                    return self._db.execute(
+                        "DELETE FROM answers WHERE data_version NOT IN (?, ?)",
+                        (data_version, previous_version or data_version),
+                    ).rowcount
+            except sqlite3.Error as e:
+                self._failed(e)
+                return 0
+
+    # Mesmo comportamento do AnswerCache.carry_over, numa única transação
+    def carry_over(
+        self,
+        old_version: str,
+        new_version: str,
+        should_drop: Callable[[CacheKey, Dependencies], bool],
+    ) -> int:
+        with self._lock:
+            try:
+                with self._maintenance():
+                    self._db.execute("BEGIN IMMEDIATE")
+                    try:
+                        removed = self._db.execute(
+                            "DELETE FROM answers WHERE data_version NOT IN (?, ?)",
+                            (old_version, new_version),
+                        ).rowcount
+                        rows = self._db.execute(
+                            "SELECT rowid, query, prompt_version, dependencies"
+                            " FROM answers WHERE data_version = ?",
+                            (old_version,),
+                        ).fetchall()
+                        stale = [
+                            (rowid,)
+                            for rowid, query, prompt_version, dependencies in rows
+                            if should_drop(
+                                (query, old_version, prompt_version),
+                                _load_dependencies(dependencies),
+                            )
+                        ]
+                        self._db.executemany(
+                            "DELETE FROM answers WHERE rowid = ?", stale
+                        )
+                        if new_version != old_version:
+                            # Chaves que já existem na nova versão ficam com a resposta mais nova
+                            removed += self._db.execute(
+                                "DELETE FROM answers WHERE data_version = ? AND EXISTS ("
+                                " SELECT 1 FROM answers AS newer WHERE newer.data_version = ?"
+                                " AND newer.query = answers.query"
+                                " AND newer.prompt_version = answers.prompt_version)",
+                                (old_version, new_version),
+                            ).rowcount
+                            self._db.execute(
+                                "UPDATE answers SET data_version = ? WHERE data_version = ?",
+                                (new_version, old_version),
+                            )
+                        self._db.execute("COMMIT")
+                    except BaseException:
+                        self._db.execute("ROLLBACK")
+                        raise
+                    return removed + len(stale)
+            except sqlite3.Error as e:
+                self._failed(e)
+                return 0
+
+    def clear(self) -> None:
+        with self._lock:
+            try:
+                with self._maintenance():
+                    self._db.execute("DELETE FROM answers")
+            except sqlite3.Error as e:
+                self._failed(e)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            try:
+                (size,) = self._db.execute("SELECT COUNT(*) FROM answers").fetchone()
+            except sqlite3.Error as e:
+                self._failed(e)
+                size = 0
+            total = self.hits + self.misses
+            return {
+                "backend": "sqlite",
+                "size": size,
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "errors": self.errors,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+def _dump_dependencies(dependencies: Dependencies) -> Optional[str]:
+    if dependencies is None:
+        return None
+    return json.dumps(sorted(dependencies), ensure_ascii=False)
+
+
+def _load_dependencies(text: Optional[str]) -> Dependencies:
+    if text is None:
+        return None
+    return frozenset(tuple(path) for path in json.loads(text))
+
+
+# Cache de respostas conforme CACHE_BACKEND
+def create_answer_cache() -> Union[AnswerCache, SQLiteAnswerCache]:
+    if CACHE_BACKEND == "sqlite":
+        try:
+            return SQLiteAnswerCache(
+                CACHE_PATH, max_entries=ANSWER_CACHE_SIZE, ttl=ANSWER_CACHE_TTL
+            )
+        except (OSError, sqlite3.Error) as e:
+            print(
+                f"AVISO: não foi possível abrir o cache SQLite em {CACHE_PATH}: {e}. "
+                "Usando cache em memória."
+            )
+    elif CACHE_BACKEND != "memory":
+        print(
+            f"AVISO: CACHE_BACKEND desconhecido: {CACHE_BACKEND!r}. Usando cache em memória."
+        )
+    return AnswerCache(max_entries=ANSWER_CACHE_SIZE, ttl=ANSWER_CACHE_TTL)
+
+
+T = TypeVar("T")
+
+
+# Agrupa chamadas idênticas simultâneas (single-flight): enquanto uma chamada
+# com a mesma chave está em andamento, as demais esperam e recebem o mesmo resultado.
+# Usado apenas dentro do event loop.
+class SingleFlight:
+    def __init__(self):
+        self._in_flight: Dict[Any, "asyncio.Future[Any]"] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: Any, call: Callable[[], Awaitable[T]]) -> T:
+        future = self._in_flight.get(key)
+        if future is None:
+            self.calls += 1
+            future = asyncio.ensure_future(call())
+            self._in_flight[key] = future
+            future.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.coalesced += 1
+        # shield: se quem está esperando desistir, a chamada continua para os demais
+        return await asyncio.shield(future)
+
+    def _finish(self, key: Any, future: "asyncio.Future[Any]") -> None:
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+        # Marca a exceção como tratada mesmo que ninguém mais esteja esperando
+        if not future.cancelled():
+            future.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight),
+        }
@@ -0,0 +1,129 @@
+import os
+
+from dotenv import load_dotenv
+
+# Carregar variáveis de ambiente do arquivo .env
+load_dotenv()
+
+
+# Funções auxiliares para ler configurações numéricas do ambiente
+def env_int(name: str, default: int) -> int:
+    value = os.environ.get(name, "").strip()
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        print(f"AVISO: valor inválido para {name}: {value!r}. Usando {default}.")
+        return default
+
+
+def env_float(name: str, default: float) -> float:
+    value = os.environ.get(name, "").strip()
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        print(f"AVISO: valor inválido para {name}: {value!r}. Usando {default}.")
+        return default
+
+
+def env_bool(name: str, default: bool) -> bool:
+    value = os.environ.get(name, "").strip().lower()
+    if not value:
+        return default
+    return value in ("1", "true", "yes", "on", "sim")
+
+
+# Caminho do arquivo de dados (montado em /app/data pelo docker-compose)
+DATA_PATH = os.environ.get(
+    "FURIA_DATA_PATH",
+    os.path.join(os.path.dirname(__file__), "data", "furia_esports.json"),
+)
+
+# Intervalo (em segundos) entre verificações de alteração do arquivo de dados
+DATA_RELOAD_INTERVAL = env_float("DATA_RELOAD_INTERVAL", 2.0)
+
+# Diretório dos artefatos pré-calculados do dataset (contexto e índices),
+# reaproveitados pelos workers e reinícios; vazio desativa
+ARTIFACTS_DIR = os.environ.get(
+    "ARTIFACTS_DIR", os.path.join(os.path.dirname(__file__), ".artifacts")
+).strip()
+
+# Backend de LLM: "openai", "ollama" (modelo local) ou "stub" (determinístico, para testes)
+LLM_BACKEND = os.environ.get("LLM_BACKEND", "openai")
+
+# Modelo, pool de conexões, timeouts e concorrência do cliente OpenAI
+OPENAI_MODEL = os.environ.get("OPENAI_MODEL", "gpt-3.5-turbo")
+OPENAI_MAX_CONCURRENCY = env_int("OPENAI_MAX_CONCURRENCY", 50)
+OPENAI_MAX_CONNECTIONS = env_int("OPENAI_MAX_CONNECTIONS", 100)
+OPENAI_MAX_KEEPALIVE = env_int("OPENAI_MAX_KEEPALIVE", 20)
+OPENAI_KEEPALIVE_EXPIRY = env_float("OPENAI_KEEPALIVE_EXPIRY", 30.0)
+OPENAI_TIMEOUT = env_float("OPENAI_TIMEOUT", 30.0)
+OPENAI_CONNECT_TIMEOUT = env_float("OPENAI_CONNECT_TIMEOUT", 5.0)
+OPENAI_MAX_RETRIES = env_int("OPENAI_MAX_RETRIES", 2)
+
+# Ollama local (ver backend/Modelfile e o serviço "ollama" do docker-compose)
+OLLAMA_URL = os.environ.get("OLLAMA_URL", "http://localhost:11434")
+OLLAMA_MODEL = os.environ.get("OLLAMA_MODEL", "mistral")
+OLLAMA_TIMEOUT = env_float("OLLAMA_TIMEOUT", 60.0)
+OLLAMA_MAX_CONCURRENCY = env_int("OLLAMA_MAX_CONCURRENCY", 2)
+
+# Backend stub: latência artificial (segundos) e concorrência
+STUB_LATENCY = env_float("STUB_LATENCY", 0.0)
+STUB_MAX_CONCURRENCY = env_int("STUB_MAX_CONCURRENCY", 100)
+
+# Cache de respostas do LLM
+ANSWER_CACHE_SIZE = env_int("ANSWER_CACHE_SIZE", 1024)
+ANSWER_CACHE_TTL = env_float("ANSWER_CACHE_TTL", 3600.0)
+# "memory" (um cache por worker) ou "sqlite" (um arquivo compartilhado por
+# todos os workers da máquina, em CACHE_PATH)
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "memory").strip().lower()
+CACHE_PATH = os.environ.get(
+    "CACHE_PATH",
+    os.path.join(os.path.dirname(__file__), ".artifacts", "answer-cache.sqlite3"),
+)
+
+# Contexto por recuperação: só os trechos mais relevantes do dataset vão para o prompt
+RETRIEVAL_ENABLED = env_bool("RETRIEVAL_ENABLED", True)
+RETRIEVAL_TOP_K = env_int("RETRIEVAL_TOP_K", 6)
+CONTEXT_TOKEN_BUDGET = env_int("CONTEXT_TOKEN_BUDGET", 600)
+
+# Perguntas factuais simples (estatística, função, coach, lineup) respondidas
+# direto do índice de entidades, sem chamar o LLM
+DIRECT_ANSWERS_ENABLED = env_bool("DIRECT_ANSWERS_ENABLED", True)
+
+# Perguntas em lote (/query/batch e batch.py): tamanho máximo do lote e
+# chamadas simultâneas ao LLM por lote
+BATCH_MAX_QUERIES = env_int("BATCH_MAX_QUERIES", 1000)
+BATCH_LLM_CONCURRENCY = env_int("BATCH_LLM_CONCURRENCY", 4)
+
+# Token da API de administração (/admin/data); vazio desativa a API
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "").strip()
+
+# Chat por WebSocket: histórico por conexão, limitado em mensagens e em tokens
+SESSION_MAX_MESSAGES = env_int("SESSION_MAX_MESSAGES", 20)
+SESSION_TOKEN_BUDGET = env_int("SESSION_TOKEN_BUDGET", 800)
+
+# Prazo por requisição e circuit breaker em volta da chamada ao LLM
+LLM_DEADLINE = env_float("LLM_DEADLINE", 8.0)
+# Se maior que zero, responde com o fallback quando o LLM passa desse tempo
+# (a chamada continua em segundo plano e alimenta o cache)
+LLM_HEDGE_AFTER = env_float("LLM_HEDGE_AFTER", 0.0)
+BREAKER_FAILURE_THRESHOLD = env_int("BREAKER_FAILURE_THRESHOLD", 5)
+BREAKER_RESET_TIMEOUT = env_float("BREAKER_RESET_TIMEOUT", 30.0)
+BREAKER_HALF_OPEN_MAX_CALLS = env_int("BREAKER_HALF_OPEN_MAX_CALLS", 1)
+
+# Prontidão (/ready): exigir a conexão com o LLM aberta (senão basta o
+# aquecimento local) e intervalo entre tentativas de conectar na inicialização
+READY_REQUIRE_LLM = env_bool("READY_REQUIRE_LLM", True)
+LLM_WARMUP_RETRY = env_float("LLM_WARMUP_RETRY", 5.0)
+
+# Controle de admissão: chamadas além do limite de concorrência do backend
+# esperam numa fila de até LLM_MAX_QUEUE posições por até LLM_QUEUE_TIMEOUT
+# segundos (0 = sem limite). Com a fila cheia ou a espera estourada, a política
+# "fallback" responde com o fallback local e "reject" devolve 503 com Retry-After.
+LLM_MAX_QUEUE = env_int("LLM_MAX_QUEUE", 64)
+LLM_QUEUE_TIMEOUT = env_float("LLM_QUEUE_TIMEOUT", 2.0)
+LLM_OVERLOAD_POLICY = os.environ.get("LLM_OVERLOAD_POLICY", "fallback").strip().lower()
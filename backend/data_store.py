@@ -0,0 +1,611 @@
+import asyncio
+import glob
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from stat import S_IMODE, S_ISDIR
+from typing import (
+    Any,
+    Callable,
+    Collection,
+    Dict,
+    FrozenSet,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from config import ARTIFACTS_DIR, DATA_PATH
+from entities import ENTITY_SOURCES, EntityIndex
+from metrics import DATA_PATCHES_TOTAL, DATA_RELOADS_TOTAL, STAGE_SECONDS
+from retrieval import (
+    ROOT,
+    ChunkPath,
+    RetrievalIndex,
+    chunks_under,
+    overlaps,
+    section_of,
+    section_order,
+)
+from schema import validate
+
+
+# Trechos do contexto completo, um por seção do dataset. Cada função recebe
+# o conteúdo da seção e devolve o texto correspondente.
+def _info_fragment(info: Dict[str, Any]) -> str:
+    return f"Sobre: {info.get('sobre', '')}\nFundada em: {info.get('fundada', '')}\n"
+
+
+def _times_fragment(times: Dict[str, Any]) -> str:
+    parts: List[str] = ["\nTimes:\n"]
+    add = parts.append
+    for jogo, info in times.items():
+        add(f"\n{jogo}:\n")
+        add(f"- Lineup: {', '.join(info.get('lineup', []))}\n")
+        add(f"- Campeonatos: {', '.join(info.get('campeonatos', []))}\n")
+        if "conquistas" in info:
+            add("- Conquistas:\n")
+            for conquista in info.get("conquistas", []):
+                add(f"  * {conquista}\n")
+    return "".join(parts)
+
+
+def _competicoes_fragment(competicoes: List[Dict[str, Any]]) -> str:
+    parts: List[str] = ["\nPrincipais Competições:\n"]
+    for comp in competicoes:
+        parts.append(f"- {comp.get('nome', '')}: {comp.get('resultado', '')}\n")
+    return "".join(parts)
+
+
+def _lol_fragment(lol_data: Dict[str, Any]) -> str:
+    parts: List[str] = ["\nLeague of Legends (2025):\n"]
+    add = parts.append
+    if "lineup" in lol_data:
+        lineup = lol_data["lineup"]
+        add(
+            f"- Lineup atual: {lineup.get('top', '')} (Top), "
+            f"{lineup.get('jungle', '')} (Jungle), {lineup.get('mid', '')} (Mid), "
+            f"{lineup.get('adc', '')} (ADC), {lineup.get('support', '')} (Support)\n"
+        )
+
+    if "coaching_staff" in lol_data:
+        coaches = lol_data["coaching_staff"]
+        add(
+            f"- Comissão Técnica: {coaches.get('head_coach', '')} (Head Coach), "
+            f"{coaches.get('assistant_coach', '')} (Assistant Coach)\n"
+        )
+
+    if "latest_competition" in lol_data:
+        comp = lol_data["latest_competition"]
+        add(f"- Competição atual: {comp.get('name', '')}\n")
+    return "".join(parts)
+
+
+def _cs_fragment(cs_data: Dict[str, Any]) -> str:
+    parts: List[str] = ["\nCounter Strike 2 (2025):\n"]
+    add = parts.append
+    if "lineup" in cs_data:
+        add(f"- Lineup atual: {', '.join(cs_data['lineup'])}\n")
+
+    if "coaching_staff" in cs_data:
+        coaches = cs_data["coaching_staff"]
+        add(
+            f"- Comissão Técnica: {coaches.get('head_coach', '')} (Head Coach), "
+            f"{coaches.get('assistant_coach', '')} (Assistant Coach)\n"
+        )
+
+    if "latest_competition" in cs_data:
+        comp = cs_data["latest_competition"]
+        add(
+            f"- Competição recente: {comp.get('name', '')}, Resultado: {comp.get('result', '')}\n"
+        )
+
+    if "notes" in cs_data:
+        add("- Notas: " + "; ".join(cs_data["notes"]) + "\n")
+    return "".join(parts)
+
+
+def _valorant_fragment(val_data: Dict[str, Any]) -> str:
+    parts: List[str] = ["\nValorant (2025):\n"]
+    add = parts.append
+    if "lineup" in val_data:
+        add(f"- Lineup atual: {', '.join(val_data['lineup'])}\n")
+
+    if "coaching_staff" in val_data:
+        coaches = val_data["coaching_staff"]
+        add(f"- Comissão Técnica: {coaches.get('head_coach', '')} (Head Coach)\n")
+
+    if "academy_team" in val_data:
+        academy = val_data["academy_team"]
+        add(
+            f"- Time Academy: {', '.join(academy.get('players', []))}, "
+            f"Coach: {academy.get('coach', '')}\n"
+        )
+
+    if "notes" in val_data:
+        add("- Notas: " + "; ".join(val_data["notes"]) + "\n")
+    return "".join(parts)
+
+
+def _titles_fragment(titles: Dict[str, Any]) -> str:
+    parts: List[str] = ["\nConquistas Históricas:\n"]
+    add = parts.append
+    for game, achievements in titles.items():
+        add(f"\n{game.replace('_', ' ')}:\n")
+        for achievement in achievements:
+            add(f"- {achievement.get('year', '')}: {achievement.get('title', '')}\n")
+    return "".join(parts)
+
+
+def _statistics_fragment(stats: Dict[str, Any]) -> str:
+    parts: List[str] = ["\nEstatísticas de Jogadores:\n"]
+    add = parts.append
+    for game, players in stats.items():
+        add(f"\n{game.replace('_', ' ')}:\n")
+        for player, player_stats in players.items():
+            stats_list = [
+                f"{stat_name}: {stat_value}"
+                for stat_name, stat_value in player_stats.items()
+            ]
+            add(f"- {player}: " + ", ".join(stats_list) + "\n")
+    return "".join(parts)
+
+
+# Seções que aparecem no contexto completo, na ordem em que aparecem
+CONTEXT_FRAGMENTS: List[Tuple[ChunkPath, Callable[[Any], str]]] = [
+    (("info",), _info_fragment),
+    (("times",), _times_fragment),
+    (("competicoes",), _competicoes_fragment),
+    ((ROOT, "League_of_Legends"), _lol_fragment),
+    ((ROOT, "Counter_Strike_2"), _cs_fragment),
+    ((ROOT, "Valorant"), _valorant_fragment),
+    ((ROOT, "historical_titles"), _titles_fragment),
+    ((ROOT, "statistics"), _statistics_fragment),
+]
+
+
+def _lookup(furia_data: Dict[str, Any], path: ChunkPath) -> Any:
+    value: Any = furia_data
+    for key in path:
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+# Texto de cada seção do contexto completo ("" se a seção não existe).
+# Com `only`, calcula apenas as seções que se sobrepõem a esses caminhos.
+def context_fragments(
+    furia_data: Dict[str, Any], only: Optional[Collection[ChunkPath]] = None
+) -> Dict[ChunkPath, str]:
+    fragments = {}
+    for path, render in CONTEXT_FRAGMENTS:
+        if only is not None and not any(overlaps(path, changed) for changed in only):
+            continue
+        content = _lookup(furia_data, path)
+        fragments[path] = render(content) if content is not None else ""
+    return fragments
+
+
+def join_fragments(fragments: Dict[ChunkPath, str]) -> str:
+    return "Informações sobre a FURIA Esports:\n\n" + "".join(
+        fragments.get(path, "") for path, _ in CONTEXT_FRAGMENTS
+    )
+
+
+# Função para gerar o contexto com base nos dados da FURIA
+def generate_context(furia_data: Dict[str, Any]) -> str:
+    return join_fragments(context_fragments(furia_data))
+
+
+# Versão imutável dos dados carregados e do contexto já montado.
+# Os dados são compartilhados entre requisições e devem ser tratados como somente leitura.
+class DataSnapshot(NamedTuple):
+    data: Dict[str, Any]
+    context: str
+    version: str  # hash sha256 do conteúdo do arquivo
+    mtime: float
+    size: int
+    index: RetrievalIndex  # índice dos trechos do dataset para montar contextos menores
+    entities: (
+        EntityIndex  # jogadores, comissão técnica e títulos para respostas diretas
+    )
+    fragments: Dict[ChunkPath, str]  # trechos do contexto completo por seção
+    previous_version: Optional[str] = None  # versão publicada antes desta
+    # Seções alteradas pela API de administração (None numa carga completa do arquivo)
+    changed: Optional[FrozenSet[ChunkPath]] = None
+
+
+EMPTY_SNAPSHOT = DataSnapshot(
+    {}, generate_context({}), "", 0.0, 0, RetrievalIndex([]), EntityIndex({}), {}
+)
+
+
+# Alteração recusada (caminho inválido, erro de esquema ou arquivo alterado por fora)
+class DataPatchError(ValueError):
+    def __init__(self, errors: List[str], conflict: bool = False):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+        self.conflict = conflict
+
+
+# Cópia dos dados com o valor trocado (ou removido) no caminho. Só os objetos
+# ao longo do caminho são copiados; o resto é compartilhado com a versão anterior.
+def _with_value(
+    data: Dict[str, Any], path: ChunkPath, value: Any, delete: bool
+) -> Dict[str, Any]:
+    key = path[0]
+    updated = dict(data)
+    if len(path) == 1:
+        if delete:
+            if key not in updated:
+                raise DataPatchError([f"{key}: caminho não encontrado"])
+            del updated[key]
+        else:
+            updated[key] = value
+        return updated
+    child = data.get(key)
+    if not isinstance(child, dict):
+        raise DataPatchError([f"{key}: caminho não encontrado ou não é um objeto"])
+    try:
+        updated[key] = _with_value(child, path[1:], value, delete)
+    except DataPatchError as e:
+        raise DataPatchError([f"{key}.{error}" for error in e.errors]) from None
+    return updated
+
+
+# Gravar o arquivo de forma atômica: escreve num temporário no mesmo diretório
+# e troca com os.replace, então quem lê nunca vê um arquivo pela metade.
+# O arquivo novo mantém as permissões (e, se possível, o dono) do anterior;
+# o mkstemp cria o temporário só com acesso do próprio usuário.
+def write_atomic(path: str, raw: bytes) -> None:
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        original: Optional[os.stat_result] = os.stat(path)
+    except FileNotFoundError:
+        original = None
+    handle, temp_path = tempfile.mkstemp(dir=directory, prefix=".furia-", suffix=".tmp")
+    try:
+        with os.fdopen(handle, "wb") as file:
+            file.write(raw)
+            file.flush()
+            if original is not None:
+                os.chmod(temp_path, S_IMODE(original.st_mode))
+                try:
+                    os.chown(temp_path, original.st_uid, original.st_gid)
+                except (OSError, AttributeError):
+                    pass  # Sem permissão para trocar o dono (ou sistema sem chown)
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+# Artefatos pré-calculados: dados, trechos do contexto e trechos do índice de
+# busca com os termos já contados, de uma versão do dataset, gravados uma vez
+# em ARTIFACTS_DIR. O primeiro worker que carrega uma versão grava o arquivo e
+# os demais (e os próximos reinícios) só o leem, sem tokenizar o dataset de
+# novo. Isso economiza tempo de CPU, não memória: cada worker mantém sua
+# própria cópia. O formato é JSON (ler o arquivo nunca executa código) e o
+# diretório precisa ser do próprio usuário.
+ARTIFACT_SOURCES = ("data_store.py", "retrieval.py", "entities.py", "cache.py")
+ARTIFACTS_KEPT = 4
+
+
+# Identifica o código que monta os artefatos: se ele muda, os arquivos
+# antigos deixam de ser usados
+def _artifact_fingerprint() -> str:
+    digest = hashlib.sha256()
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for name in ARTIFACT_SOURCES:
+        with open(os.path.join(directory, name), "rb") as file:
+            digest.update(file.read())
+    return digest.hexdigest()[:12]
+
+
+ARTIFACT_FINGERPRINT = _artifact_fingerprint()
+
+Artifacts = Tuple[Dict[str, Any], Dict[ChunkPath, str], RetrievalIndex, EntityIndex]
+
+
+def artifact_path(version: str) -> str:
+    return os.path.join(
+        ARTIFACTS_DIR, f"furia-{version[:16]}-{ARTIFACT_FINGERPRINT}.json"
+    )
+
+
+# Criar o diretório dos artefatos (0700) e conferir que ele é um diretório de
+# verdade, do próprio usuário; senão os artefatos não são usados
+def _artifacts_dir_ready() -> bool:
+    if not ARTIFACTS_DIR:
+        return False
+    try:
+        os.makedirs(ARTIFACTS_DIR, mode=0o700, exist_ok=True)
+        info = os.lstat(ARTIFACTS_DIR)
+        if not S_ISDIR(info.st_mode) or (
+            hasattr(os, "getuid") and info.st_uid != os.getuid()
+        ):
+            print(
+                f"AVISO: {ARTIFACTS_DIR} não é um diretório do usuário atual. "
+                "Artefatos desativados."
+            )
+            return False
+        if S_IMODE(info.st_mode) & 0o077:
+            os.chmod(ARTIFACTS_DIR, 0o700)
+    except OSError as e:
+        print(f"AVISO: diretório de artefatos indisponível ({ARTIFACTS_DIR}): {e}")
+        return False
+    return True
+
+
+# Artefatos já calculados para a versão dos dados; None se não houver
+# (ou se o arquivo estiver corrompido, e então eles são refeitos)
+def load_artifacts(version: str) -> Optional[Artifacts]:
+    if not _artifacts_dir_ready():
+        return None
+    path = artifact_path(version)
+    try:
+        with open(path, "rb") as file:
+            stored = json.loads(file.read().decode("utf-8"))
+        if stored.get("version") != version:
+            return None
+        data = stored["data"]
+        fragments = {tuple(section): text for section, text in stored["fragments"]}
+        return data, fragments, RetrievalIndex.load(stored["chunks"]), EntityIndex(data)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Artefatos ignorados ({path}): {e!r}")
+        return None
+
+
+# Gravar os artefatos da versão e apagar os mais antigos. Falhas só geram
+# aviso: sem os artefatos, cada worker monta os índices sozinho.
+def save_artifacts(version: str, artifacts: Artifacts) -> None:
+    if not _artifacts_dir_ready():
+        return
+    data, fragments, index, _ = artifacts
+    stored = {
+        "version": version,
+        "data": data,
+        "fragments": [[list(section), text] for section, text in fragments.items()],
+        "chunks": index.dump(),
+    }
+    try:
+        write_atomic(
+            artifact_path(version),
+            json.dumps(stored, ensure_ascii=False).encode("utf-8"),
+        )
+        saved = sorted(
+            glob.glob(os.path.join(ARTIFACTS_DIR, "furia-*.json")), key=os.path.getmtime
+        )
+        for old in saved[:-ARTIFACTS_KEPT]:
+            os.unlink(old)
+    except OSError as e:
+        print(f"Erro ao gravar artefatos: {e}")
+
+
+# Mantém os dados da FURIA em memória e recarrega quando o arquivo muda
+class FuriaDataStore:
+    def __init__(self, path: str = DATA_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._snapshot = EMPTY_SNAPSHOT
+        # (mtime, tamanho) da última versão inválida, para não repetir o aviso
+        self._rejected: Optional[Tuple[float, int]] = None
+        # Funções chamadas sempre que uma nova versão dos dados é publicada
+        self._listeners: List[Callable[[DataSnapshot], None]] = []
+
+    @property
+    def snapshot(self) -> DataSnapshot:
+        # A troca do snapshot é uma única atribuição: quem leu a versão antiga
+        # continua com ela até o fim da requisição
+        return self._snapshot
+
+    def add_listener(self, listener: Callable[[DataSnapshot], None]) -> None:
+        self._listeners.append(listener)
+
+    # Verifica mtime/tamanho do arquivo e recarrega se o conteúdo mudou.
+    # Retorna True se uma nova versão foi publicada.
+    def reload_if_changed(self) -> bool:
+        with self._lock:
+            current = self._snapshot
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                if current is EMPTY_SNAPSHOT and self._rejected is None:
+                    print("Arquivo não encontrado. Verifique o caminho do arquivo.")
+                    self._rejected = (0.0, 0)
+                return False
+
+            file_id = (stat.st_mtime, stat.st_size)
+            if current.version and file_id == (current.mtime, current.size):
+                return False
+            if file_id == self._rejected:
+                return False
+
+            try:
+                with open(self.path, "rb") as file:
+                    raw = file.read()
+            except OSError as e:
+                print(f"Erro ao carregar dados: {e}")
+                return False
+
+            version = hashlib.sha256(raw).hexdigest()
+            if version == current.version:
+                # Só os metadados mudaram (ex.: touch), o contexto continua válido
+                self._snapshot = current._replace(
+                    mtime=stat.st_mtime, size=stat.st_size
+                )
+                return False
+
+            with STAGE_SECONDS.time("data_load"):
+                artifacts = load_artifacts(version)
+                if artifacts is None:
+                    try:
+                        data = json.loads(raw.decode("utf-8"))
+                    except (UnicodeDecodeError, json.JSONDecodeError):
+                        # Pode ser uma escrita pela metade: mantém a versão anterior
+                        print(
+                            "Erro ao decodificar o JSON. Verifique a formatação do arquivo."
+                        )
+                        self._rejected = file_id
+                        return False
+                    try:
+                        artifacts = (
+                            data,
+                            context_fragments(data),
+                            RetrievalIndex.from_data(data),
+                            EntityIndex(data),
+                        )
+                    except (AttributeError, KeyError, TypeError, ValueError) as e:
+                        # Seção com formato inesperado (ex.: null): mantém a versão anterior
+                        print(
+                            f"Erro no formato dos dados da FURIA: {e!r}. Verifique o arquivo."
+                        )
+                        self._rejected = file_id
+                        return False
+                    save_artifacts(version, artifacts)
+
+                data, fragments, index, entities = artifacts
+                snapshot = DataSnapshot(
+                    data=data,
+                    context=join_fragments(fragments),
+                    version=version,
+                    mtime=stat.st_mtime,
+                    size=stat.st_size,
+                    index=index,
+                    entities=entities,
+                    fragments=fragments,
+                    previous_version=current.version or None,
+                )
+            self._snapshot = snapshot
+            self._rejected = None
+            DATA_RELOADS_TOTAL.inc()
+            print(f"Dados da FURIA carregados (versão {version[:12]}).")
+
+        self._notify(snapshot)
+        return True
+
+    def _notify(self, snapshot: DataSnapshot) -> None:
+        for listener in self._listeners:
+            try:
+                listener(snapshot)
+            except Exception as e:
+                print(f"Erro ao notificar recarga dos dados: {e}")
+
+    # Alterar (ou remover) o valor de um caminho do dataset, validar a seção
+    # contra o esquema e gravar o arquivo. Só as partes que dependem da seção
+    # alterada são refeitas: trecho do contexto completo, trechos do índice de
+    # busca e (se for o caso) o índice de entidades. Retorna o novo snapshot.
+    def apply_patch(
+        self, path: ChunkPath, value: Any = None, delete: bool = False
+    ) -> DataSnapshot:
+        # Publica antes qualquer edição feita direto no arquivo
+        self.reload_if_changed()
+        if not path or (path[0] == ROOT and len(path) < 2):
+            raise DataPatchError(
+                [
+                    "Informe o caminho de uma seção (ex.: FURIA_Esports_2025.Valorant.lineup)"
+                ]
+            )
+        if any(not key.strip() for key in path):
+            raise DataPatchError([f"Caminho com uma chave vazia: {'.'.join(path)!r}"])
+
+        with self._lock:
+            current = self._snapshot
+            if not current.version:
+                raise DataPatchError(["Os dados da FURIA não estão carregados"])
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                stat = None
+            if stat is None or (stat.st_mtime, stat.st_size) != (
+                current.mtime,
+                current.size,
+            ):
+                raise DataPatchError(
+                    ["O arquivo foi alterado por fora; tente novamente"], conflict=True
+                )
+
+            with STAGE_SECONDS.time("data_patch"):
+                data = _with_value(current.data, path, value, delete)
+                # A validação cobre a seção inteira em que o caminho está (a
+                # menos que a própria seção tenha sido removida); null numa
+                # seção conhecida é recusado pelo esquema
+                top = path[:2] if path[0] == ROOT else path[:1]
+                if not (delete and len(path) <= len(top)):
+                    errors = validate(top, _lookup(data, top))
+                    if errors:
+                        raise DataPatchError(errors)
+
+                # Tudo é montado antes de gravar: se algo falhar, o arquivo não muda
+                try:
+                    # Seções afetadas: as que já existiam e as que passaram a existir no caminho
+                    prefix = section_of(path)
+                    new_chunks = chunks_under(data, prefix)
+                    changed = {prefix} | {
+                        section_of(chunk.path)
+                        for chunk in current.index.chunks + new_chunks
+                        if overlaps(chunk.path, prefix)
+                    }
+                    fragments = {
+                        **current.fragments,
+                        **context_fragments(data, only=[prefix]),
+                    }
+                    index = current.index.replace_sections(
+                        changed, new_chunks, section_order(data)
+                    )
+                    entities = current.entities
+                    if any(overlaps(prefix, (ROOT, key)) for key in ENTITY_SOURCES):
+                        entities = EntityIndex(data)
+                except (AttributeError, KeyError, TypeError, ValueError) as e:
+                    raise DataPatchError(
+                        [
+                            f"{'.'.join(path)}: valor incompatível com o formato dos dados ({e})"
+                        ]
+                    )
+
+                raw = (json.dumps(data, ensure_ascii=False, indent=2) + "\n").encode(
+                    "utf-8"
+                )
+                write_atomic(self.path, raw)
+                stat = os.stat(self.path)
+
+                snapshot = current._replace(
+                    data=data,
+                    context=join_fragments(fragments),
+                    version=hashlib.sha256(raw).hexdigest(),
+                    mtime=stat.st_mtime,
+                    size=stat.st_size,
+                    index=index,
+                    entities=entities,
+                    fragments=fragments,
+                    previous_version=current.version,
+                    changed=frozenset(changed),
+                )
+                # Os outros workers vão recarregar o arquivo e encontrar os artefatos prontos
+                save_artifacts(snapshot.version, (data, fragments, index, entities))
+            self._snapshot = snapshot
+            self._rejected = None
+            DATA_PATCHES_TOTAL.inc()
+            print(
+                f"Dados da FURIA alterados em {'.'.join(path)} (versão {snapshot.version[:12]})."
+            )
+
+        self._notify(snapshot)
+        return snapshot
+
+    # Tarefa em segundo plano que verifica o arquivo periodicamente
+    async def watch(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.reload_if_changed)
+            except Exception as e:
+                print(f"Erro ao recarregar dados: {e}")
@@ -0,0 +1,455 @@
+from collections import defaultdict
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from cache import normalize_query
+
+# Times do dataset: chave no JSON, nome exibido, apelidos usados pelos fãs e
+# chaves usadas em statistics/historical_titles
+TEAMS = {
+    "League_of_Legends": {
+        "label": "League of Legends",
+        "alias": "lol",
+        "aliases": {"lol", "league", "legends"},
+        "keys": {"League_of_Legends"},
+    },
+    "Counter_Strike_2": {
+        "label": "CS2",
+        "alias": "cs2",
+        "aliases": {"cs", "cs2", "csgo", "counter"},
+        "keys": {"Counter_Strike_2", "Counter-Strike"},
+    },
+    "Valorant": {
+        "label": "Valorant",
+        "alias": "valorant",
+        "aliases": {"val", "valorant"},
+        "keys": {"Valorant"},
+    },
+}
+
+# Seções do dataset lidas pelo índice (alterá-las exige refazer o índice)
+ENTITY_SOURCES = (*TEAMS, "statistics", "historical_titles")
+
+# Estatísticas: palavra da pergunta -> chave no JSON
+STAT_KEYWORDS = {
+    "rating": "rating",
+    "kd": "kd_ratio",
+    "acs": "acs",
+    "kda": "kda",
+    "hs": "headshot_percentage",
+    "headshot": "headshot_percentage",
+    "entry": "entry_kills_per_round",
+    "dpm": "dpm",
+    "dano": "dpm",
+    "participacao": "kill_participation",
+    "kp": "kill_participation",
+}
+STAT_LABELS = {
+    "rating": "rating",
+    "kd_ratio": "K/D",
+    "entry_kills_per_round": "entry kills por round",
+    "acs": "ACS",
+    "kda": "KDA",
+    "headshot_percentage": "porcentagem de headshot",
+    "kill_participation": "participação em kills",
+    "dpm": "dano por minuto",
+}
+ALL_STATS_WORDS = {"estatisticas", "estatistica", "stats", "numeros", "desempenho"}
+ROLE_WORDS = {"funcao", "posicao", "role", "lane", "rota"}
+COACH_WORDS = {"coach", "tecnico", "treinador", "treina", "comissao"}
+LINEUP_WORDS = {"lineup", "elenco", "jogadores", "integrantes", "escalacao"}
+TITLE_WORDS = {"titulos", "titulo", "conquistas", "trofeus", "campeao"}
+# Palavras que indicam pergunta aberta (opinião, comparação, previsão)
+OPEN_ENDED_WORDS = {
+    "melhor",
+    "pior",
+    "acha",
+    "opiniao",
+    "comparar",
+    "compara",
+    "vs",
+    "versus",
+    "porque",
+    "por",
+    "vai",
+    "vao",
+    "deveria",
+    "previsao",
+    "chance",
+}
+ROLE_LABELS = {
+    "top": "Top",
+    "jungle": "Jungle",
+    "mid": "Mid",
+    "adc": "ADC",
+    "support": "Support",
+}
+STAFF_LABELS = {
+    "head_coach": "head coach",
+    "assistant_coach": "assistente técnico",
+    "analyst": "analista",
+    "general_manager": "gerente geral",
+    "coach": "coach do time academy",
+}
+
+
+class Player(NamedTuple):
+    name: str
+    team: str  # chave do time (ex.: "Valorant")
+    role: Optional[str]
+    academy: bool
+    stats: Dict[str, Any]
+    bio: Optional[str]
+
+
+class Staff(NamedTuple):
+    name: str
+    team: str
+    position: str
+
+
+def trigrams(word: str) -> Set[str]:
+    padded = f"${word}$"
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+# Distância de edição (inserção, remoção, troca ou transposição de letras
+# vizinhas) entre duas palavras; para em limit + 1
+def edit_distance(a: str, b: str, limit: int) -> int:
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i]
+        for j in range(1, len(b) + 1):
+            cost = previous[j - 1] if a[i - 1] == b[j - 1] else previous[j - 1] + 1
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if current[j - 1] + 1 < cost:
+                cost = current[j - 1] + 1
+            if (
+                i > 1
+                and j > 1
+                and a[i - 1] == b[j - 2]
+                and a[i - 2] == b[j - 1]
+                and previous2[j - 2] + 1 < cost
+            ):
+                cost = previous2[j - 2] + 1
+            current.append(cost)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
+def _team_for_game_key(key: str) -> Optional[str]:
+    for team, info in TEAMS.items():
+        if key in info["keys"]:
+            return team
+    return None
+
+
+# Índice de entidades (jogadores, comissão técnica, times e títulos) montado a
+# partir do dataset, com busca tolerante a acentos e erros de digitação
+class EntityIndex:
+    def __init__(self, furia_data: Dict[str, Any]):
+        root = furia_data.get("FURIA_Esports_2025", {})
+        self.players: Dict[str, Player] = {}
+        self.staff: Dict[str, Staff] = {}
+        self.lineups: Dict[str, Any] = {}
+        self.titles: Dict[str, List[Dict[str, Any]]] = {}
+
+        stats_by_player: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for game_key, players in root.get("statistics", {}).items():
+            team = _team_for_game_key(game_key)
+            for player, stats in players.items():
+                stats_by_player[(team, normalize_query(player))] = stats
+        for game_key, titles in root.get("historical_titles", {}).items():
+            team = _team_for_game_key(game_key)
+            if team:
+                self.titles[team] = titles
+
+        for team in TEAMS:
+            data = root.get(team)
+            if not isinstance(data, dict):
+                continue
+            bios = {
+                normalize_query(name): bio
+                for name, bio in data.get("players_bio", {}).items()
+            }
+            lineup = data.get("lineup", [])
+            self.lineups[team] = lineup
+            members = (
+                lineup.items()
+                if isinstance(lineup, dict)
+                else [(None, name) for name in lineup]
+            )
+            for role, name in members:
+                self._add_player(name, team, role, False, stats_by_player, bios)
+            academy = data.get("academy_team", {})
+            for name in academy.get("players", []):
+                self._add_player(name, team, None, True, stats_by_player, bios)
+            if academy.get("coach"):
+                self._add_staff(academy["coach"], team, "coach")
+            for position, name in data.get("coaching_staff", {}).items():
+                self._add_staff(name, team, position)
+
+        # Índice de trigramas dos nomes, para tolerar erros de digitação
+        self._trigrams: Dict[str, Set[str]] = defaultdict(set)
+        self._trigram_counts: Dict[str, int] = {}
+        for key in list(self.players) + list(self.staff):
+            grams = trigrams(key)
+            self._trigram_counts[key] = len(grams)
+            for gram in grams:
+                self._trigrams[gram].add(key)
+
+    def _add_player(self, name, team, role, academy, stats_by_player, bios) -> None:
+        key = normalize_query(name)
+        if key:
+            self.players[key] = Player(
+                name,
+                team,
+                role,
+                academy,
+                stats_by_player.get((team, key), {}),
+                bios.get(key),
+            )
+
+    def _add_staff(self, name: str, team: str, position: str) -> None:
+        key = normalize_query(name)
+        if key and key not in self.staff:
+            self.staff[key] = Staff(name, team, position)
+
+    # Nome do índice mais parecido com a palavra: exato, por trigramas ou, entre
+    # os nomes com algum trigrama em comum, a até uma letra de diferença (duas
+    # em palavras longas). Erros de uma letra em nomes curtos ("tutz",
+    # "raffa", "kserato") mudam trigramas demais para passar do limite. Entre
+    # palavras de 4 letras a diferença de uma letra não vale ("head" não é "heat").
+    def lookup_name(self, word: str, threshold: float = 0.7) -> Optional[str]:
+        if word in self.players or word in self.staff:
+            return word
+        if len(word) < 4:
+            return None
+        grams = trigrams(word)
+        counts: Dict[str, int] = defaultdict(int)
+        for gram in grams:
+            for key in self._trigrams.get(gram, ()):
+                counts[key] += 1
+        best, best_score = None, threshold
+        for key, shared in counts.items():
+            score = 2 * shared / (len(grams) + self._trigram_counts[key])
+            if score >= best_score:
+                best, best_score = key, score
+        if best is not None:
+            return best
+
+        max_edits = 1 if len(word) < 8 else 2
+        close: List[Tuple[int, int, str]] = []
+        for key, shared in counts.items():
+            if max(len(word), len(key)) < 5 or abs(len(word) - len(key)) > max_edits:
+                continue
+            # Cada letra errada muda no máximo 4 trigramas do nome
+            if shared < self._trigram_counts[key] - 4 * max_edits:
+                continue
+            edits = edit_distance(word, key, max_edits)
+            if edits <= max_edits:
+                close.append((edits, -shared, key))
+        return min(close)[2] if close else None
+
+    # Times (pelos apelidos) e nomes do índice citados na pergunta
+    def mentions(self, words: List[str]) -> Tuple[Set[str], List[str]]:
+        word_set = set(words)
+        teams = {team for team, info in TEAMS.items() if info["aliases"] & word_set}
+        names: List[str] = []
+        for word in words:
+            if word in STAT_KEYWORDS or word in _KEYWORDS:
+                continue
+            name = self.lookup_name(word)
+            if name and name not in names:
+                names.append(name)
+        return teams, names
+
+    # Assunto da pergunta (jogador ou membro da comissão com o apelido do time,
+    # ou só o time), para lembrar em perguntas de continuação; None se não
+    # citar ninguém ou citar mais de um
+    def topic(self, query: str) -> Optional[str]:
+        teams, names = self.mentions(normalize_query(query).split())
+        if len(names) == 1:
+            person = self.players.get(names[0]) or self.staff[names[0]]
+            return f"{person.name} {TEAMS[person.team]['alias']}"
+        if len(teams) == 1 and not names:
+            return TEAMS[next(iter(teams))]["alias"]
+        return None
+
+    # Pergunta que depende do assunto anterior (fala de coach, lineup,
+    # estatísticas ou títulos, ou usa um pronome como "deles")
+    def is_follow_up(self, query: str) -> bool:
+        return not FOLLOW_UP_WORDS.isdisjoint(normalize_query(query).split())
+
+    # Resposta direta para perguntas factuais simples; None se a pergunta for
+    # aberta, ambígua ou não citar uma entidade conhecida
+    def answer(self, query: str) -> Optional[str]:
+        words = normalize_query(query.replace("/", "")).split()
+        if not words or OPEN_ENDED_WORDS.intersection(words):
+            return None
+        # Ano na pergunta indica algo histórico (ex.: lineup de 2024), fora do índice
+        if any(len(word) == 4 and word.isdigit() for word in words):
+            return None
+        word_set = set(words)
+
+        teams, names = self.mentions(words)
+        if len(teams) > 1 or len(names) > 1:
+            return None
+
+        player = self.players.get(names[0]) if names else None
+        staff = self.staff.get(names[0]) if names and not player else None
+        person = player or staff
+        team = next(iter(teams), None)
+        if person and team and team != person.team:
+            return None
+        team = team or (person.team if person else None)
+
+        if player:
+            stat_keys = [STAT_KEYWORDS[word] for word in words if word in STAT_KEYWORDS]
+            if stat_keys:
+                return self._stats_answer(player, stat_keys)
+            if ALL_STATS_WORDS & word_set:
+                return self._stats_answer(player, list(player.stats))
+            if ROLE_WORDS & word_set:
+                return self._role_answer(player)
+        if team and COACH_WORDS & word_set:
+            return self._coach_answer(team)
+        if team and not names and LINEUP_WORDS & word_set:
+            return self._lineup_answer(team)
+        if team and not names and TITLE_WORDS & word_set:
+            return self._titles_answer(team)
+        if "quem" in word_set and len(word_set - _PROFILE_FILLER) == 1:
+            if player:
+                return self._player_profile(player)
+            if staff:
+                return self._staff_profile(staff)
+        return None
+
+    def _stats_answer(self, player: Player, stat_keys: List[str]) -> Optional[str]:
+        available = [key for key in dict.fromkeys(stat_keys) if key in player.stats]
+        if not available:
+            return None
+        parts = [
+            f"{STAT_LABELS.get(key, key)}: {player.stats[key]}" for key in available
+        ]
+        return (
+            f"Estatísticas de {player.name} ({TEAMS[player.team]['label']}): "
+            + ", ".join(parts)
+            + "."
+        )
+
+    def _role_answer(self, player: Player) -> Optional[str]:
+        if not player.role:
+            return None
+        role = ROLE_LABELS.get(player.role, player.role)
+        return f"{player.name} joga de {role} no time de {TEAMS[player.team]['label']} da FURIA."
+
+    def _coach_answer(self, team: str) -> Optional[str]:
+        staff = [
+            member
+            for member in self.staff.values()
+            if member.team == team and member.position != "coach"
+        ]
+        if not staff:
+            return None
+        parts = [
+            f"{member.name} ({STAFF_LABELS.get(member.position, member.position)})"
+            for member in staff
+        ]
+        return (
+            f"A comissão técnica de {TEAMS[team]['label']} da FURIA: "
+            + ", ".join(parts)
+            + "."
+        )
+
+    def _lineup_answer(self, team: str) -> Optional[str]:
+        lineup = self.lineups.get(team)
+        if not lineup:
+            return None
+        if isinstance(lineup, dict):
+            members = ", ".join(
+                f"{name} ({ROLE_LABELS.get(role, role)})"
+                for role, name in lineup.items()
+            )
+        else:
+            members = ", ".join(lineup)
+        return f"O lineup atual de {TEAMS[team]['label']} da FURIA é: {members}."
+
+    def _titles_answer(self, team: str) -> Optional[str]:
+        titles = self.titles.get(team)
+        if not titles:
+            return None
+        parts = [
+            f"{title.get('title', '')} ({title.get('year', '')})" for title in titles
+        ]
+        return f"Títulos da FURIA em {TEAMS[team]['label']}: " + "; ".join(parts) + "."
+
+    def _player_profile(self, player: Player) -> str:
+        team = TEAMS[player.team]["label"]
+        where = f"do time academy de {team}" if player.academy else f"do time de {team}"
+        role = f" ({ROLE_LABELS.get(player.role, player.role)})" if player.role else ""
+        text = f"{player.name} é jogador {where} da FURIA{role}."
+        if player.bio:
+            text += f" {player.bio}"
+        if player.stats:
+            text += " " + self._stats_answer(player, list(player.stats))
+        return text
+
+    def _staff_profile(self, staff: Staff) -> str:
+        position = STAFF_LABELS.get(staff.position, staff.position)
+        return f"{staff.name} é {position} de {TEAMS[staff.team]['label']} na FURIA."
+
+
+_KEYWORDS = (
+    ALL_STATS_WORDS
+    | ROLE_WORDS
+    | COACH_WORDS
+    | LINEUP_WORDS
+    | TITLE_WORDS
+    | {alias for info in TEAMS.values() for alias in info["aliases"]}
+)
+# Pronomes que retomam o assunto anterior ("e o coach deles?")
+PRONOUN_WORDS = {
+    "ele",
+    "ela",
+    "eles",
+    "elas",
+    "dele",
+    "dela",
+    "deles",
+    "delas",
+    "nele",
+    "nela",
+}
+# Palavras de uma pergunta de continuação: sem elas (ex.: "valeu!", "tchau")
+# a mensagem não herda o assunto da conversa
+FOLLOW_UP_WORDS = (
+    set(STAT_KEYWORDS)
+    | ALL_STATS_WORDS
+    | ROLE_WORDS
+    | COACH_WORDS
+    | LINEUP_WORDS
+    | TITLE_WORDS
+    | PRONOUN_WORDS
+)
+# Palavras permitidas em "quem é X?" além do próprio nome
+_PROFILE_FILLER = {
+    "quem",
+    "e",
+    "eh",
+    "o",
+    "a",
+    "ai",
+    "esse",
+    "essa",
+    "me",
+    "fala",
+    "do",
+    "da",
+    "sobre",
+}
@@ -0,0 +1,320 @@
+import re
+from typing import Dict, FrozenSet, List, Optional, Pattern, Tuple
+
+# Base de conhecimento para respostas sem OpenAI
+KNOWLEDGE_BASE = {
+    # CS2 / Counter Strike
+    "cs2_lineup": "Nosso time de CS2 é composto por KSCERATO, yuurih, FalleN, chelo e skullz. Eles são considerados um dos melhores times do Brasil e competem nos maiores torneios internacionais.",
+    "cs2_coach": "A comissão técnica de CS2 é liderada por sidde como head coach, com Lucid como assistente técnico e innersh1ne como analista.",
+    "cs2_achievements": "Entre as conquistas no CS2/CSGO estão: ESL Pro League Season 12 North America (2020), IEM Fall North America (2021) e CBCS Elite League Season 2 (2022). Também fomos finalistas da IEM Dallas 2022.",
+    "cs2_competitions": "Nossa equipe de CS2 compete em torneios como ESL Pro League, BLAST Premier, IEM e campeonatos regionais como a CBCS.",
+    "cs2_player_kscerato": "KSCERATO é um dos principais jogadores da FURIA, com rating médio de 1.18, 0.14 entry kills por round e K/D ratio de 1.3. Ele renovou contrato por 3 anos.",
+    "cs2_player_fallen": "FalleN é um veterano lendário do CS brasileiro que se juntou à FURIA. Ele mantém um rating de 1.02, com 0.08 entry kills por round e K/D ratio de 1.05.",
+    "cs2_player_yuurih": "yuurih é um dos pilares da FURIA CS2, conhecido por sua consistência. Ele recentemente renovou seu contrato por 3 anos com a organização.",
+    "cs2_recent": "Recentemente nossa equipe de CS2 participou da Esports World Cup em Riade, onde fomos eliminados pela NAVI.",
+    "cs2_changes": "A mudança mais recente no nosso time de CS2 foi a saída de arT (que foi para o Fluxo) e a entrada de skullz na equipe.",
+    # League of Legends
+    "lol_lineup": "Nosso time de League of Legends que compete no CBLOL é formado por Guigo (Top), Tatu (Jungle), Tutsz (Mid), Ayu (ADC) e JoJo (Support).",
+    "lol_coach": "A comissão técnica de League of Legends é liderada por Thinkcard como head coach, com furyz como assistente técnico e Maestro como gerente geral.",
+    "lol_achievements": "No League of Legends, conquistamos o CBLOL Academy 1° Split 2022 e o CBLOL Academy 2° Split 2023. Além disso, chegamos ao Top 4 no CBLOL 2023.",
+    "lol_competitions": "Nossa equipe de LoL compete principalmente no CBLOL (Campeonato Brasileiro de League of Legends) e no CBLOL Academy.",
+    "lol_recent": "Nossa equipe está se preparando para a LTA Sul 2025, com o sorteio marcado para 18 de janeiro de 2025 e início em 25 de janeiro de 2025.",
+    "lol_player_ayu": "Ayu é nosso atirador (ADC), com bom posicionamento e mecânica apurada. Ele mantém um KDA de 5.1, participação em kills de 72% e 540 de dano por minuto.",
+    "lol_player_tutsz": "Tutsz é nosso mid laner versátil com experiência no CBLOL. Ele tem um KDA de 4.3, participação em kills de 68% e 490 de dano por minuto.",
+    "lol_changes": "Em 2025, retornamos à comunicação em português e formamos uma equipe que combina experiência e novos talentos.",
+    "lol_previous": "Na temporada anterior (CBLOL 2024), nosso time era composto por Zzk (Top), Wiz (Jungle), Tutsz (Mid), Ayu (ADC) e JoJo (Support), com Westonway como técnico.",
+    # Valorant
+    "valorant_lineup": "A equipe principal de Valorant da FURIA é composta por khalil, havoc, heat, raafa e pryze.",
+    "valorant_coach": "O head coach da nossa equipe de Valorant é peu, que lidera a comissão técnica.",
+    "valorant_academy": "Temos também um time academy de Valorant formado por Above, Desire, Loss, skz e swag, com ryotzz como treinador.",
+    "valorant_achievements": "No Valorant, fomos campeões do VCT Challengers Brazil em 2021 e finalistas do VCT Brazil Playoffs em 2022. Também alcançamos o Top 8 no VCT Americas 2023.",
+    "valorant_competitions": "Nossa equipe de Valorant compete no VCT Americas e no Challengers BR.",
+    "valorant_player_heat": "heat é um dos nossos principais jogadores de Valorant, com ACS de 240, KDA de 1.25 e 27% de headshot.",
+    "valorant_player_raafa": "raafa traz experiência e liderança ao time de Valorant, com ACS de 210, KDA de 1.30 e 25% de headshot.",
+    "valorant_changes": "Atualmente mwzera está afastado temporariamente por questões de saúde, enquanto heat e raafa trazem experiência e liderança ao time.",
+    # Informações gerais
+    "furia_history": "A FURIA Esports é uma organização brasileira de esportes eletrônicos fundada em 2017. Nos destacamos em modalidades como CS2, League of Legends e Valorant.",
+    "furia_branding": "Nossa identidade visual é caracterizada pelo preto como cor primária e branco como secundária, com a pantera como símbolo e um estilo agressivo e moderno.",
+    "furia_other": "A FURIA já teve times em outras modalidades como Rocket League (último evento: RLCS South America 2022) e Rainbow Six Siege (último evento: Brasileirão R6 2022), que atualmente estão inativos.",
+    # Respostas gerais
+    "default": "Sou o chatbot oficial da FURIA Esports. Posso fornecer informações sobre nossos times de League of Legends, Counter Strike 2 e Valorant. Como posso ajudar você hoje?",
+    "unknown": "Não tenho essa informação específica no momento. Posso ajudar com detalhes sobre nossos times atuais de CS2, League of Legends e Valorant, ou sobre a história da FURIA. O que você gostaria de saber?",
+    "greeting": "E aí! Tudo bem? Sou o bot oficial da FURIA Esports, pronto pra te ajudar com informações sobre nossos times e jogadores. O que você quer saber sobre a pantera? 🐾🖤",
+    "thanks": "Por nada! Sempre à disposição para falar sobre a FURIA. Se tiver mais perguntas, é só chamar! #GoPantera 🖤",
+    "goodbye": "Valeu pela conversa! Se precisar de mais informações sobre a FURIA, é só voltar. #SomosFURIA 🐾",
+}
+
+# Lista de palavras-chave e frases para identificar intenções
+INTENT_PATTERNS = {
+    # CS2 / Counter Strike
+    "cs2_lineup": [
+        r"(line(\s)?up|elenco|jogadores|integrantes|time).*(cs|counter|cs2)",
+        r"(cs|counter|cs2).*(line(\s)?up|elenco|jogadores|integrantes|time)",
+        r"quem.*(joga|está).*(cs|counter|cs2)",
+        r"quem.*(é|são).*jogadores.*(cs|counter|cs2)",
+    ],
+    "cs2_coach": [
+        r"(técnico|coach|treinador|comissão).*(cs|counter|cs2)",
+        r"(cs|counter|cs2).*(técnico|coach|treinador|comissão)",
+        r"quem.*(treina|comanda).*(cs|counter|cs2)",
+    ],
+    "cs2_achievements": [
+        r"(conquistas|títulos|troféus|vitórias|campeonatos).*(cs|counter|cs2)",
+        r"(cs|counter|cs2).*(conquistas|títulos|troféus|vitórias|campeonatos)",
+        r"(cs|counter|cs2).*(ganhou|venceu|conquistou)",
+    ],
+    "cs2_competitions": [
+        r"(competições|torneios|campeonatos|disputam).*(cs|counter|cs2)",
+        r"(cs|counter|cs2).*(competições|torneios|campeonatos|disputam)",
+    ],
+    "cs2_player_kscerato": [r"kscerato"],
+    "cs2_player_fallen": [r"fallen"],
+    "cs2_player_yuurih": [r"yuurih"],
+    "cs2_recent": [
+        r"(recente|última|recém).*(cs|counter|cs2)",
+        r"(cs|counter|cs2).*(recente|última|recém)",
+        r"como.*(foi|está).*(cs|counter|cs2)",
+    ],
+    "cs2_changes": [
+        r"(mudanças|alterações|trocas|substituições).*(cs|counter|cs2)",
+        r"(cs|counter|cs2).*(mudanças|alterações|trocas|substituições)",
+    ],
+    # League of Legends
+    "lol_lineup": [
+        r"(line(\s)?up|elenco|jogadores|integrantes|time).*(lol|league|legends)",
+        r"(lol|league|legends).*(line(\s)?up|elenco|jogadores|integrantes|time)",
+        r"quem.*(joga|está).*(lol|league|legends)",
+        r"quem.*(é|são).*jogadores.*(lol|league|legends)",
+    ],
+    "lol_coach": [
+        r"(técnico|coach|treinador|comissão).*(lol|league|legends)",
+        r"(lol|league|legends).*(técnico|coach|treinador|comissão)",
+        r"quem.*(treina|comanda).*(lol|league|legends)",
+    ],
+    "lol_achievements": [
+        r"(conquistas|títulos|troféus|vitórias|campeonatos).*(lol|league|legends)",
+        r"(lol|league|legends).*(conquistas|títulos|troféus|vitórias|campeonatos)",
+        r"(lol|league|legends).*(ganhou|venceu|conquistou)",
+    ],
+    "lol_competitions": [
+        r"(competições|torneios|campeonatos|disputam).*(lol|league|legends)",
+        r"(lol|league|legends).*(competições|torneios|campeonatos|disputam)",
+    ],
+    "lol_recent": [
+        r"(recente|última|recém|próxima).*(lol|league|legends)",
+        r"(lol|league|legends).*(recente|última|recém|próxima)",
+        r"como.*(foi|está).*(lol|league|legends)",
+    ],
+    "lol_player_ayu": [r"ayu"],
+    "lol_player_tutsz": [r"tutsz"],
+    "lol_changes": [
+        r"(mudanças|alterações|trocas|substituições).*(lol|league|legends)",
+        r"(lol|league|legends).*(mudanças|alterações|trocas|substituições)",
+    ],
+    "lol_previous": [
+        r"(antiga|anterior|passada|2024).*(lol|league|legends)",
+        r"(lol|league|legends).*(antiga|anterior|passada|2024)",
+    ],
+    # Valorant
+    "valorant_lineup": [
+        r"(line(\s)?up|elenco|jogadores|integrantes|time).*(val|valorant)",
+        r"(val|valorant).*(line(\s)?up|elenco|jogadores|integrantes|time)",
+        r"quem.*(joga|está).*(val|valorant)",
+        r"quem.*(é|são).*jogadores.*(val|valorant)",
+    ],
+    "valorant_coach": [
+        r"(técnico|coach|treinador|comissão).*(val|valorant)",
+        r"(val|valorant).*(técnico|coach|treinador|comissão)",
+        r"quem.*(treina|comanda).*(val|valorant)",
+    ],
+    "valorant_academy": [
+        r"(academy|base|jovem).*(val|valorant)",
+        r"(val|valorant).*(academy|base|jovem)",
+    ],
+    "valorant_achievements": [
+        r"(conquistas|títulos|troféus|vitórias|campeonatos).*(val|valorant)",
+        r"(val|valorant).*(conquistas|títulos|troféus|vitórias|campeonatos)",
+        r"(val|valorant).*(ganhou|venceu|conquistou)",
+    ],
+    "valorant_competitions": [
+        r"(competições|torneios|campeonatos|disputam).*(val|valorant)",
+        r"(val|valorant).*(competições|torneios|campeonatos|disputam)",
+    ],
+    "valorant_player_heat": [r"heat"],
+    "valorant_player_raafa": [r"raafa"],
+    "valorant_changes": [
+        r"(mudanças|alterações|trocas|substituições).*(val|valorant)",
+        r"(val|valorant).*(mudanças|alterações|trocas|substituições)",
+        r"mwzera",
+    ],
+    # Informações gerais
+    "furia_history": [
+        r"(história|fundação|fundada|sobre).*(furia|pantera)",
+        r"quando.*(foi|surgiu|nasceu|criada)",
+        r"quem.*(fundou|criou)",
+    ],
+    "furia_branding": [
+        r"(logo|marca|símbolo|cor|visual|identidade|mascote)",
+        r"pantera",
+    ],
+    "furia_other": [
+        r"(outros|outras).*(jogos|modalidades|esports)",
+        r"(rocket|r6|rainbow|siege)",
+    ],
+    # Respostas gerais
+    "greeting": [
+        r"^(oi|olá|e aí|salve|opa|eae|beleza|tudo bem|como vai)",
+        r"(oi|olá|e aí|salve|opa|eae|beleza)$",
+    ],
+    "thanks": [
+        r"(obrigad|valeu|agradec|thanks|brigad|vlw)",
+        r"(obrigad|valeu|agradec|thanks|brigad|vlw)$",
+    ],
+    "goodbye": [r"^(tchau|adeus|até|flw|falou)", r"(tchau|adeus|até|flw|falou)$"],
+}
+
+
+_REGEX_METACHARS = set("\\.^$*+?{}[]|()")
+
+
+# Prefixo literal de um trecho de regex (ex.: "line(\\s)?up" -> "line").
+# Retorna "" se o trecho não começa com um literal obrigatório.
+def _literal_prefix(fragment: str) -> str:
+    prefix = []
+    for char in fragment:
+        if char in _REGEX_METACHARS:
+            # Um quantificador torna opcional o caractere anterior
+            if char in "?*{" and prefix:
+                prefix.pop()
+            break
+        prefix.append(char)
+    return "".join(prefix)
+
+
+# Divide um texto pelos "|" que estão no nível mais externo
+def _split_top_level(fragment: str) -> List[str]:
+    parts, depth, current = [], 0, []
+    for char in fragment:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        if char == "|" and depth == 0:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    parts.append("".join(current))
+    return parts
+
+
+# Literais dos quais pelo menos um precisa aparecer no texto para o padrão casar.
+# Retorna None quando não é possível garantir isso (o padrão é sempre testado).
+def required_literals(pattern: str) -> Optional[FrozenSet[str]]:
+    # Parênteses/barras escapados e classes de caracteres confundem a análise
+    if any(token in pattern for token in ("\\(", "\\)", "\\|", "[")):
+        return None
+    body = pattern[1:] if pattern.startswith("^") else pattern
+    if body.startswith("("):
+        # Primeiro grupo: cada alternativa precisa começar com um literal
+        depth = 0
+        for end, char in enumerate(body):
+            if char == "(":
+                depth += 1
+            elif char == ")":
+                depth -= 1
+                if depth == 0:
+                    break
+        else:
+            return None
+        if body[end + 1 : end + 2] in ("?", "*", "{"):
+            return None
+        alternatives = [_literal_prefix(part) for part in _split_top_level(body[1:end])]
+    else:
+        alternatives = _split_top_level(body)
+        if len(alternatives) > 1:
+            return None
+        alternatives = [_literal_prefix(body)]
+    if not all(alternatives):
+        return None
+    return frozenset(alternatives)
+
+
+# Motor de intenções compilado uma única vez. Cada padrão é pré-compilado e
+# associado aos literais que ele exige; antes de rodar qualquer regex, uma
+# varredura de substrings descobre quais literais aparecem na pergunta e só
+# os padrões candidatos são avaliados. O resultado (intenções e sua ordem) é o
+# mesmo de testar cada padrão com re.search, na ordem de INTENT_PATTERNS.
+class IntentMatcher:
+    def __init__(self, intent_patterns: Dict[str, List[str]]):
+        self.intents: List[
+            Tuple[str, List[Tuple[Optional[FrozenSet[str]], Pattern[str]]]]
+        ] = []
+        literals = set()
+        for intent, patterns in intent_patterns.items():
+            compiled = []
+            for pattern in patterns:
+                required = required_literals(pattern)
+                if required:
+                    literals.update(required)
+                compiled.append((required, re.compile(pattern)))
+            self.intents.append((intent, compiled))
+        self.literals = tuple(sorted(literals))
+
+    # Retorna as intenções encontradas no texto (já em minúsculas), na ordem da tabela
+    def match(self, text: str) -> List[str]:
+        present = {literal for literal in self.literals if literal in text}
+        matched = []
+        for intent, patterns in self.intents:
+            for required, regex in patterns:
+                if required is not None and required.isdisjoint(present):
+                    continue
+                if regex.search(text):
+                    matched.append(intent)
+                    break
+        return matched
+
+
+INTENT_MATCHER = IntentMatcher(INTENT_PATTERNS)
+
+# Palavras-chave gerais de cada jogo, usadas quando nenhuma intenção é encontrada
+GAME_KEYWORDS = [
+    (
+        "cs2_lineup",
+        re.compile("|".join(["cs", "cs2", "counter", "counter-strike", "fps"])),
+    ),
+    ("lol_lineup", re.compile("|".join(["lol", "league", "legends", "moba"]))),
+    ("valorant_lineup", re.compile("|".join(["val", "valorant"]))),
+]
+
+
+# Identificar as intenções de uma pergunta
+def match_intents(query: str) -> List[str]:
+    return INTENT_MATCHER.match(query.lower())
+
+
+# Montar a resposta do fallback a partir das intenções encontradas
+def build_fallback_response(query_lower: str, matched_intents: List[str]) -> str:
+    # Se encontrou correspondências específicas
+    responses = [
+        KNOWLEDGE_BASE[intent] for intent in matched_intents if intent in KNOWLEDGE_BASE
+    ]
+
+    # Verificar palavras-chave gerais se não encontrou correspondências específicas
+    if not responses:
+        for intent, keywords in GAME_KEYWORDS:
+            if keywords.search(query_lower):
+                responses.append(KNOWLEDGE_BASE[intent])
+                break
+        else:
+            # Resposta padrão se nada for identificado
+            responses.append(KNOWLEDGE_BASE["default"])
+
+    # Combinar respostas (limite a 2 para não ficar muito longo)
+    return " ".join(responses[:2])
+
+
+# Função avançada de fallback para processar perguntas sem usar a OpenAI
+def advanced_fallback_response(query: str) -> str:
+    query_lower = query.lower()
+    return build_fallback_response(query_lower, INTENT_MATCHER.match(query_lower))
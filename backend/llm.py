@@ -0,0 +1,272 @@
+import asyncio
+import json
+import os
+import re
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, NamedTuple, Optional
+
+from config import (
+    LLM_BACKEND,
+    LLM_MAX_QUEUE,
+    LLM_QUEUE_TIMEOUT,
+    OLLAMA_MAX_CONCURRENCY,
+    OLLAMA_MODEL,
+    OLLAMA_TIMEOUT,
+    OLLAMA_URL,
+    OPENAI_CONNECT_TIMEOUT,
+    OPENAI_KEEPALIVE_EXPIRY,
+    OPENAI_MAX_CONCURRENCY,
+    OPENAI_MAX_CONNECTIONS,
+    OPENAI_MAX_KEEPALIVE,
+    OPENAI_MAX_RETRIES,
+    OPENAI_MODEL,
+    OPENAI_TIMEOUT,
+    STUB_LATENCY,
+    STUB_MAX_CONCURRENCY,
+)
+from metrics import LLM_QUEUE_WAIT_SECONDS
+from resilience import AdmissionController
+
+Messages = List[Dict[str, str]]
+
+
+# Resposta completa de um backend, com a contagem de tokens quando disponível
+class Completion(NamedTuple):
+    text: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
+# Interface comum dos backends de LLM. Cada backend tem seu próprio timeout
+# e limite de chamadas simultâneas, com fila de espera limitada (ver
+# AdmissionController); chamadas recusadas levantam OverloadedError.
+class LLMBackend:
+    name = "base"
+
+    def __init__(self, model: str, timeout: float, max_concurrency: int):
+        self.model = model
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.admission = AdmissionController(
+            max_concurrency, LLM_MAX_QUEUE, LLM_QUEUE_TIMEOUT
+        )
+
+    # Identifica backend e modelo (entra na chave do cache de respostas)
+    @property
+    def model_id(self) -> str:
+        return f"{self.name}:{self.model}"
+
+    # Ocupar uma vaga do controle de admissão durante a chamada
+    @asynccontextmanager
+    async def _admitted(self) -> AsyncIterator[None]:
+        waited = await self.admission.acquire()
+        LLM_QUEUE_WAIT_SECONDS.observe(waited, self.name)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.admission.release(time.monotonic() - started)
+
+    async def complete(self, messages: Messages) -> Completion:
+        async with self._admitted():
+            return await asyncio.wait_for(
+                self._complete(messages), timeout=self.timeout
+            )
+
+    async def stream(self, messages: Messages) -> AsyncIterator[str]:
+        async with self._admitted():
+            async for token in self._stream(messages):
+                yield token
+
+    # Preparar o backend antes das primeiras perguntas (ex.: abrir a conexão).
+    # Levanta exceção se o backend não estiver acessível.
+    async def warmup(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    async def _complete(self, messages: Messages) -> Completion:
+        raise NotImplementedError
+
+    async def _stream(self, messages: Messages) -> AsyncIterator[str]:
+        # Backends sem streaming entregam a resposta inteira de uma vez
+        completion = await self._complete(messages)
+        yield completion.text
+
+
+# OpenAI (ou API compatível via OPENAI_BASE_URL) com pool de conexões keep-alive
+class OpenAIBackend(LLMBackend):
+    name = "openai"
+
+    def __init__(self, api_key: str, model: str, timeout: float, max_concurrency: int):
+        import httpx
+        from openai import AsyncOpenAI
+
+        super().__init__(model, timeout, max_concurrency)
+        # Conexões keep-alive reaproveitadas entre as chamadas
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=OPENAI_MAX_KEEPALIVE,
+                keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(timeout, connect=OPENAI_CONNECT_TIMEOUT),
+        )
+        self.client = AsyncOpenAI(
+            api_key=api_key,
+            max_retries=OPENAI_MAX_RETRIES,
+            http_client=http_client,
+        )
+
+    async def _complete(self, messages: Messages) -> Completion:
+        completion = await self.client.chat.completions.create(
+            model=self.model, messages=messages
+        )
+        usage = completion.usage
+        return Completion(
+            text=completion.choices[0].message.content or "",
+            prompt_tokens=usage.prompt_tokens if usage else 0,
+            completion_tokens=usage.completion_tokens if usage else 0,
+        )
+
+    async def _stream(self, messages: Messages) -> AsyncIterator[str]:
+        stream = await self.client.chat.completions.create(
+            model=self.model, messages=messages, stream=True
+        )
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            token = chunk.choices[0].delta.content
+            if token:
+                yield token
+
+    # Qualquer resposta HTTP indica a conexão aberta, exceto chave inválida ou sem permissão
+    async def warmup(self) -> None:
+        from openai import APIStatusError, AuthenticationError, PermissionDeniedError
+
+        try:
+            await self.client.models.list()
+        except (AuthenticationError, PermissionDeniedError):
+            raise
+        except APIStatusError:
+            pass
+
+    async def close(self) -> None:
+        await self.client.close()
+
+
+# Modelo local servido pelo Ollama (ex.: mistral), sem depender da internet
+class OllamaBackend(LLMBackend):
+    name = "ollama"
+
+    def __init__(self, base_url: str, model: str, timeout: float, max_concurrency: int):
+        import httpx
+
+        super().__init__(model, timeout, max_concurrency)
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            limits=httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=max_concurrency,
+            ),
+            timeout=httpx.Timeout(timeout, connect=OPENAI_CONNECT_TIMEOUT),
+        )
+
+    async def _complete(self, messages: Messages) -> Completion:
+        response = await self.client.post(
+            "/api/chat",
+            json={"model": self.model, "messages": messages, "stream": False},
+        )
+        response.raise_for_status()
+        body = response.json()
+        return Completion(
+            text=body.get("message", {}).get("content", ""),
+            prompt_tokens=body.get("prompt_eval_count", 0),
+            completion_tokens=body.get("eval_count", 0),
+        )
+
+    async def _stream(self, messages: Messages) -> AsyncIterator[str]:
+        async with self.client.stream(
+            "POST",
+            "/api/chat",
+            json={"model": self.model, "messages": messages, "stream": True},
+        ) as response:
+            response.raise_for_status()
+            # O Ollama envia uma linha JSON por pedaço da resposta
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                token = chunk.get("message", {}).get("content", "")
+                if token:
+                    yield token
+                if chunk.get("done"):
+                    break
+
+    async def warmup(self) -> None:
+        await self.client.get("/api/tags")
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+# Backend determinístico para testes e benchmarks: responde com o fallback
+# local para a última mensagem do usuário, com latência opcional
+class StubBackend(LLMBackend):
+    name = "stub"
+
+    def __init__(self, latency: float, timeout: float, max_concurrency: int):
+        super().__init__("fallback", timeout, max_concurrency)
+        self.latency = latency
+
+    async def _complete(self, messages: Messages) -> Completion:
+        from fallback import advanced_fallback_response
+
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+        query = next(
+            (
+                message["content"]
+                for message in reversed(messages)
+                if message["role"] == "user"
+            ),
+            "",
+        )
+        text = advanced_fallback_response(query)
+        return Completion(
+            text, sum(len(m["content"]) for m in messages) // 4, len(text) // 4
+        )
+
+    async def _stream(self, messages: Messages) -> AsyncIterator[str]:
+        completion = await self._complete(messages)
+        for word in re.split(r"(?<=\s)", completion.text):
+            if word:
+                yield word
+
+
+# Criar o backend configurado em LLM_BACKEND (openai, ollama ou stub).
+# Retorna None quando não há backend disponível (o bot usa apenas o fallback).
+def create_llm_backend(backend: str = LLM_BACKEND) -> Optional[LLMBackend]:
+    backend = backend.strip().lower()
+
+    if backend == "ollama":
+        return OllamaBackend(
+            OLLAMA_URL, OLLAMA_MODEL, OLLAMA_TIMEOUT, OLLAMA_MAX_CONCURRENCY
+        )
+
+    if backend == "stub":
+        return StubBackend(STUB_LATENCY, OPENAI_TIMEOUT, STUB_MAX_CONCURRENCY)
+
+    if backend != "openai":
+        print(
+            f"AVISO: LLM_BACKEND desconhecido: {backend!r}. Usando apenas o fallback."
+        )
+        return None
+
+    api_key = os.environ.get("OPENAI_API_KEY", "").strip()
+    if not api_key:
+        print("AVISO: OPENAI_API_KEY não encontrada no ambiente.")
+        return None
+    return OpenAIBackend(api_key, OPENAI_MODEL, OPENAI_TIMEOUT, OPENAI_MAX_CONCURRENCY)
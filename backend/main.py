@@ -1,17 +1,342 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import (
+    Depends,
+    FastAPI,
+    Header,
+    HTTPException,
+    WebSocket,
+    WebSocketDisconnect,
+)
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from pydantic import BaseModel
+import asyncio
+import hashlib
+import hmac
 import json
-import os
-from typing import Dict, Any, List
-from openai import OpenAI
-from dotenv import load_dotenv
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Any, List, AsyncIterator, Iterator, Optional, Set, Tuple, Union
 import re
 
-# Carregar variáveis de ambiente do arquivo .env
-load_dotenv()
+from batch import answer_batch, run_batch
+from cache import (
+    CacheKey,
+    Dependencies,
+    SingleFlight,
+    create_answer_cache,
+    make_cache_key,
+)
+from config import (
+    ADMIN_TOKEN,
+    BATCH_LLM_CONCURRENCY,
+    BATCH_MAX_QUERIES,
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_HALF_OPEN_MAX_CALLS,
+    BREAKER_RESET_TIMEOUT,
+    CONTEXT_TOKEN_BUDGET,
+    DATA_RELOAD_INTERVAL,
+    DIRECT_ANSWERS_ENABLED,
+    LLM_DEADLINE,
+    LLM_HEDGE_AFTER,
+    LLM_OVERLOAD_POLICY,
+    LLM_WARMUP_RETRY,
+    READY_REQUIRE_LLM,
+    RETRIEVAL_ENABLED,
+    RETRIEVAL_TOP_K,
+)
+from data_store import DataPatchError, DataSnapshot, FuriaDataStore
+from fallback import KNOWLEDGE_BASE, build_fallback_response, match_intents
+from llm import LLMBackend, create_llm_backend
+from metrics import (
+    ANSWERS_TOTAL,
+    Counter,
+    FALLBACK_TOTAL,
+    Gauge,
+    INTENT_HITS_TOTAL,
+    LLM_TOKENS_TOTAL,
+    REGISTRY,
+    REQUEST_SECONDS,
+    STAGE_SECONDS,
+)
+from resilience import CircuitBreaker, CircuitOpenError, OverloadedError
+from retrieval import render_context, section_of
+from session import ChatSession
+
+# Dados da FURIA mantidos em memória (recarregados quando o arquivo muda)
+data_store = FuriaDataStore()
+
+# Cache das respostas do LLM (em memória ou compartilhado entre os workers);
+# entradas de versões antigas dos dados são descartadas
+answer_cache = create_answer_cache()
+
+
+# Nova versão dos dados: numa carga completa do arquivo o cache de outras
+# versões é descartado; numa alteração pela API de administração, as respostas
+# passam para a nova versão, exceto as que usaram trechos das seções alteradas
+# ou cuja busca agora escolheria outros trechos
+def invalidate_answers(snapshot: DataSnapshot) -> None:
+    if snapshot.changed is None:
+        answer_cache.retain_data_version(snapshot.version, snapshot.previous_version)
+        return
+
+    def affected(key: CacheKey, dependencies: Dependencies) -> bool:
+        if dependencies is None:
+            return True
+        if any(section_of(path) in snapshot.changed for path in dependencies):
+            return True
+        selected = snapshot.index.select(key[0], RETRIEVAL_TOP_K, CONTEXT_TOKEN_BUDGET)
+        return frozenset(chunk.path for chunk in selected) != dependencies
+
+    removed = answer_cache.carry_over(
+        snapshot.previous_version, snapshot.version, affected
+    )
+    print(
+        f"Cache de respostas: {removed} entradas invalidadas pela alteração dos dados."
+    )
+
+
+data_store.add_listener(invalidate_answers)
+
+# Perguntas iguais feitas ao mesmo tempo compartilham uma única chamada ao LLM
+llm_flight = SingleFlight()
+
+# Circuit breaker do LLM: após falhas seguidas, vai direto para o fallback
+llm_breaker = CircuitBreaker(
+    failure_threshold=BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=BREAKER_RESET_TIMEOUT,
+    half_open_max_calls=BREAKER_HALF_OPEN_MAX_CALLS,
+)
+
+# Conversas abertas no chat por WebSocket
+chat_sessions: Set[ChatSession] = set()
+
+# Métricas lidas dos componentes na hora da coleta
+REGISTRY.register(
+    Gauge(
+        "furia_answer_cache_entries",
+        "Respostas guardadas no cache.",
+        function=lambda: {(): answer_cache.stats()["size"]},
+    )
+)
+REGISTRY.register(
+    Counter(
+        "furia_answer_cache_requests_total",
+        "Consultas ao cache de respostas por resultado.",
+        ["result"],
+        function=lambda: {("hit",): answer_cache.hits, ("miss",): answer_cache.misses},
+    )
+)
+REGISTRY.register(
+    Counter(
+        "furia_llm_coalesced_total",
+        "Chamadas ao LLM evitadas por agrupar perguntas idênticas simultâneas.",
+        function=lambda: {(): llm_flight.coalesced},
+    )
+)
+REGISTRY.register(
+    Gauge(
+        "furia_llm_queue_depth",
+        "Chamadas ao LLM esperando vaga no controle de admissão.",
+        function=lambda: {(): llm_admission_stats().get("queued", 0)},
+    )
+)
+REGISTRY.register(
+    Gauge(
+        "furia_llm_in_flight",
+        "Chamadas ao LLM em andamento.",
+        function=lambda: {(): llm_admission_stats().get("in_flight", 0)},
+    )
+)
+REGISTRY.register(
+    Counter(
+        "furia_llm_rejected_total",
+        "Chamadas ao LLM recusadas pelo controle de admissão, por motivo.",
+        ["reason"],
+        function=lambda: {
+            (reason,): count
+            for reason, count in llm_admission_stats().get("rejected", {}).items()
+        },
+    )
+)
+REGISTRY.register(
+    Gauge(
+        "furia_chat_sessions",
+        "Conexões abertas no chat por WebSocket.",
+        function=lambda: {(): len(chat_sessions)},
+    )
+)
+REGISTRY.register(
+    Gauge(
+        "furia_llm_breaker_open",
+        "Estado do circuit breaker do LLM (0 fechado, 0.5 half-open, 1 aberto).",
+        function=lambda: {
+            (): {"closed": 0, "half_open": 0.5, "open": 1}[llm_breaker.state]
+        },
+    )
+)
+
+
+REGISTRY.register(
+    Gauge(
+        "furia_startup_seconds",
+        "Tempo de cada etapa da inicialização.",
+        ["step"],
+        function=lambda: {
+            (step,): seconds for step, seconds in startup_timings.items()
+        },
+    )
+)
+REGISTRY.register(
+    Gauge(
+        "furia_ready",
+        "1 se o serviço está pronto para receber tráfego (ver /ready).",
+        function=lambda: {(): int(all(readiness_checks().values()))},
+    )
+)
+
+
+# Estado do controle de admissão do backend em uso (vazio sem backend)
+def llm_admission_stats() -> Dict[str, Any]:
+    backend = getattr(app.state, "llm", None)
+    return backend.admission.stats() if backend is not None else {}
+
+
+# Tempo (segundos) de cada etapa da inicialização, exposto em /ready e /metrics
+startup_timings: Dict[str, float] = {}
+
+
+@contextmanager
+def startup_step(name: str) -> Iterator[None]:
+    start = time.perf_counter()
+    yield
+    startup_timings[name] = time.perf_counter() - start
+    print(f"Inicialização: {name} em {startup_timings[name] * 1000:.1f} ms")
 
-app = FastAPI()
+
+# Perguntas usadas para exercitar os caminhos de resposta antes de receber tráfego
+WARMUP_QUERIES = (
+    "qual o lineup do cs?",
+    "quem é o coach do valorant?",
+    "quando a furia foi fundada?",
+)
+
+
+def warm_answer_paths(snapshot: DataSnapshot) -> None:
+    for query in WARMUP_QUERIES:
+        snapshot.entities.answer(query)
+        render_context(
+            snapshot.index.select(query, RETRIEVAL_TOP_K, CONTEXT_TOKEN_BUDGET)
+        )
+        build_fallback_response(query.lower(), match_intents(query.lower()))
+
+
+# Aquecimento em segundo plano, depois que o servidor já aceita conexões:
+# cria o backend de LLM numa thread (importar o cliente da OpenAI leva
+# centenas de ms), exercita os caminhos de resposta e abre a conexão com o LLM,
+# tentando de novo até conseguir
+async def warm_up(app: FastAPI) -> None:
+    with startup_step("llm_backend"):
+        backend = await asyncio.to_thread(create_llm_backend)
+    app.state.llm = backend
+    if backend is not None:
+        print(f"Backend de LLM: {backend.model_id}")
+    with startup_step("answer_paths"):
+        warm_answer_paths(data_store.snapshot)
+    app.state.warm.set()
+
+    while backend is not None and not app.state.llm_connected:
+        try:
+            with startup_step("llm_connect"):
+                await asyncio.wait_for(backend.warmup(), timeout=LLM_DEADLINE)
+            app.state.llm_connected = True
+        except Exception as e:
+            print(
+                f"AVISO: sem conexão com o LLM ({e!r}). Nova tentativa em {LLM_WARMUP_RETRY:g} s."
+            )
+            await asyncio.sleep(LLM_WARMUP_RETRY)
+    startup_timings["total"] = time.perf_counter() - app.state.started
+    print(f"Inicialização concluída em {startup_timings['total'] * 1000:.1f} ms.")
+
+
+# Registrar uma falha do aquecimento: sem ele o /ready não fica pronto
+def log_warm_up_failure(task: "asyncio.Future[None]") -> None:
+    if not task.cancelled() and task.exception() is not None:
+        print(f"Erro no aquecimento da inicialização: {task.exception()!r}")
+
+
+# Condições para receber tráfego (todas verdadeiras = pronto). O /metrics
+# também usa, então precisa funcionar antes mesmo do lifespan rodar.
+def readiness_checks() -> Dict[str, bool]:
+    backend = getattr(app.state, "llm", None)
+    warm = getattr(app.state, "warm", None)
+    return {
+        "data": bool(data_store.snapshot.version),
+        "warm": warm is not None and warm.is_set(),
+        "llm": backend is None
+        or getattr(app.state, "llm_connected", False)
+        or not READY_REQUIRE_LLM,
+    }
+
+
+# Carregar os dados na inicialização; o restante do aquecimento segue em
+# segundo plano (ver warm_up e /ready)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.started = time.perf_counter()
+    app.state.llm = None
+    app.state.llm_connected = False
+    app.state.warm = asyncio.Event()
+    with startup_step("data"):
+        data_store.reload_if_changed()
+    watcher = asyncio.create_task(data_store.watch(DATA_RELOAD_INTERVAL))
+    warmup = asyncio.create_task(warm_up(app))
+    warmup.add_done_callback(log_warm_up_failure)
+    try:
+        yield
+    finally:
+        watcher.cancel()
+        warmup.cancel()
+        if app.state.llm is not None:
+            await app.state.llm.close()
+
+
+app = FastAPI(lifespan=lifespan)
+
+# Rotas com métricas de tempo próprias (as demais são agrupadas em "other")
+TIMED_ENDPOINTS = {"/query", "/query/stream", "/query/batch"}
+
+
+# Medir o tempo de cada requisição HTTP, até o início da resposta (no caso do
+# streaming, quando saem os cabeçalhos). É um middleware ASGI simples: o
+# @app.middleware("http") passaria todo corpo de resposta por uma fila em memória.
+class RequestTimer:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        endpoint = scope["path"] if scope["path"] in TIMED_ENDPOINTS else "other"
+        observed = False
+
+        async def timed_send(message: Message) -> None:
+            nonlocal observed
+            if message["type"] == "http.response.start" and not observed:
+                observed = True
+                REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            if not observed:
+                REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint)
+
+
+app.add_middleware(RequestTimer)
 
 # Configurar CORS para permitir requisições do frontend
 app.add_middleware(
@@ -28,432 +353,586 @@ class Query(BaseModel):
     query: str
 
 
-# Carregar os dados da FURIA Esports
-def load_furia_data():
-    try:
-        data_path = os.path.join(
-            os.path.dirname(__file__), "data", "furia_esports.json"
-        )
-        with open(data_path, "r", encoding="utf-8") as file:
-            return json.load(file)
-    except FileNotFoundError:
-        print("Arquivo não encontrado. Verifique o caminho do arquivo.")
-        return {}
-    except json.JSONDecodeError:
-        print("Erro ao decodificar o JSON. Verifique a formatação do arquivo.")
-        return {}
-    except Exception as e:
-        print(f"Erro ao carregar dados: {e}")
-        return {}
-
-
-# Função para gerar o contexto com base nos dados da FURIA
-def generate_context(furia_data: Dict[str, Any]) -> str:
-    context = "Informações sobre a FURIA Esports:\n\n"
-
-    # Adicionar informações gerais
-    if "info" in furia_data:
-        context += f"Sobre: {furia_data['info'].get('sobre', '')}\n"
-        context += f"Fundada em: {furia_data['info'].get('fundada', '')}\n"
-
-    # Adicionar informações dos times
-    if "times" in furia_data:
-        context += "\nTimes:\n"
-        for jogo, info in furia_data["times"].items():
-            context += f"\n{jogo}:\n"
-            context += f"- Lineup: {', '.join(info.get('lineup', []))}\n"
-            context += f"- Campeonatos: {', '.join(info.get('campeonatos', []))}\n"
-            if "conquistas" in info:
-                context += "- Conquistas:\n"
-                for conquista in info.get("conquistas", []):
-                    context += f"  * {conquista}\n"
-
-    # Adicionar histórico de competições
-    if "competicoes" in furia_data:
-        context += "\nPrincipais Competições:\n"
-        for comp in furia_data["competicoes"]:
-            context += f"- {comp.get('nome', '')}: {comp.get('resultado', '')}\n"
-
-    # Processar dados do furia_esports.json (versão 2025)
-    if "FURIA_Esports_2025" in furia_data:
-        furia_2025 = furia_data["FURIA_Esports_2025"]
-
-        # League of Legends
-        if "League_of_Legends" in furia_2025:
-            lol_data = furia_2025["League_of_Legends"]
-            context += "\nLeague of Legends (2025):\n"
-            if "lineup" in lol_data:
-                lineup = lol_data["lineup"]
-                context += f"- Lineup atual: {lineup.get('top', '')} (Top), {lineup.get('jungle', '')} (Jungle), "
-                context += f"{lineup.get('mid', '')} (Mid), {lineup.get('adc', '')} (ADC), {lineup.get('support', '')} (Support)\n"
-
-            if "coaching_staff" in lol_data:
-                coaches = lol_data["coaching_staff"]
-                context += f"- Comissão Técnica: {coaches.get('head_coach', '')} (Head Coach), "
-                context += f"{coaches.get('assistant_coach', '')} (Assistant Coach)\n"
-
-            if "latest_competition" in lol_data:
-                comp = lol_data["latest_competition"]
-                context += f"- Competição atual: {comp.get('name', '')}\n"
-
-        # Counter Strike 2
-        if "Counter_Strike_2" in furia_2025:
-            cs_data = furia_2025["Counter_Strike_2"]
-            context += "\nCounter Strike 2 (2025):\n"
-            if "lineup" in cs_data:
-                context += f"- Lineup atual: {', '.join(cs_data['lineup'])}\n"
-
-            if "coaching_staff" in cs_data:
-                coaches = cs_data["coaching_staff"]
-                context += f"- Comissão Técnica: {coaches.get('head_coach', '')} (Head Coach), "
-                context += f"{coaches.get('assistant_coach', '')} (Assistant Coach)\n"
-
-            if "latest_competition" in cs_data:
-                comp = cs_data["latest_competition"]
-                context += f"- Competição recente: {comp.get('name', '')}, Resultado: {comp.get('result', '')}\n"
-
-            if "notes" in cs_data:
-                context += "- Notas: " + "; ".join(cs_data["notes"]) + "\n"
-
-        # Valorant
-        if "Valorant" in furia_2025:
-            val_data = furia_2025["Valorant"]
-            context += "\nValorant (2025):\n"
-            if "lineup" in val_data:
-                context += f"- Lineup atual: {', '.join(val_data['lineup'])}\n"
-
-            if "coaching_staff" in val_data:
-                coaches = val_data["coaching_staff"]
-                context += f"- Comissão Técnica: {coaches.get('head_coach', '')} (Head Coach)\n"
-
-            if "academy_team" in val_data:
-                academy = val_data["academy_team"]
-                context += f"- Time Academy: {', '.join(academy.get('players', []))}, Coach: {academy.get('coach', '')}\n"
-
-            if "notes" in val_data:
-                context += "- Notas: " + "; ".join(val_data["notes"]) + "\n"
-
-        # Conquistas históricas
-        if "historical_titles" in furia_2025:
-            titles = furia_2025["historical_titles"]
-            context += "\nConquistas Históricas:\n"
-
-            for game, achievements in titles.items():
-                context += f"\n{game.replace('_', ' ')}:\n"
-                for achievement in achievements:
-                    context += f"- {achievement.get('year', '')}: {achievement.get('title', '')}\n"
-
-        # Estatísticas
-        if "statistics" in furia_2025:
-            stats = furia_2025["statistics"]
-            context += "\nEstatísticas de Jogadores:\n"
-
-            for game, players in stats.items():
-                context += f"\n{game.replace('_', ' ')}:\n"
-                for player, player_stats in players.items():
-                    context += f"- {player}: "
-                    stats_list = []
-                    for stat_name, stat_value in player_stats.items():
-                        stats_list.append(f"{stat_name}: {stat_value}")
-                    context += ", ".join(stats_list) + "\n"
-
-    return context
-
-
-# Inicializar o cliente OpenAI com a API key do ambiente
-def get_openai_client():
-    api_key = os.environ.get("OPENAI_API_KEY")
-    if not api_key:
-        print("AVISO: OPENAI_API_KEY não encontrada no ambiente.")
-        api_key = ""  # Valor vazio para fallback
-
-    # Criar cliente sem argumentos adicionais
-    return OpenAI(api_key=api_key)
-
-
-# Base de conhecimento para respostas sem OpenAI
-KNOWLEDGE_BASE = {
-    # CS2 / Counter Strike
-    "cs2_lineup": "Nosso time de CS2 é composto por KSCERATO, yuurih, FalleN, chelo e skullz. Eles são considerados um dos melhores times do Brasil e competem nos maiores torneios internacionais.",
-    "cs2_coach": "A comissão técnica de CS2 é liderada por sidde como head coach, com Lucid como assistente técnico e innersh1ne como analista.",
-    "cs2_achievements": "Entre as conquistas no CS2/CSGO estão: ESL Pro League Season 12 North America (2020), IEM Fall North America (2021) e CBCS Elite League Season 2 (2022). Também fomos finalistas da IEM Dallas 2022.",
-    "cs2_competitions": "Nossa equipe de CS2 compete em torneios como ESL Pro League, BLAST Premier, IEM e campeonatos regionais como a CBCS.",
-    "cs2_player_kscerato": "KSCERATO é um dos principais jogadores da FURIA, com rating médio de 1.18, 0.14 entry kills por round e K/D ratio de 1.3. Ele renovou contrato por 3 anos.",
-    "cs2_player_fallen": "FalleN é um veterano lendário do CS brasileiro que se juntou à FURIA. Ele mantém um rating de 1.02, com 0.08 entry kills por round e K/D ratio de 1.05.",
-    "cs2_player_yuurih": "yuurih é um dos pilares da FURIA CS2, conhecido por sua consistência. Ele recentemente renovou seu contrato por 3 anos com a organização.",
-    "cs2_recent": "Recentemente nossa equipe de CS2 participou da Esports World Cup em Riade, onde fomos eliminados pela NAVI.",
-    "cs2_changes": "A mudança mais recente no nosso time de CS2 foi a saída de arT (que foi para o Fluxo) e a entrada de skullz na equipe.",
-    # League of Legends
-    "lol_lineup": "Nosso time de League of Legends que compete no CBLOL é formado por Guigo (Top), Tatu (Jungle), Tutsz (Mid), Ayu (ADC) e JoJo (Support).",
-    "lol_coach": "A comissão técnica de League of Legends é liderada por Thinkcard como head coach, com furyz como assistente técnico e Maestro como gerente geral.",
-    "lol_achievements": "No League of Legends, conquistamos o CBLOL Academy 1° Split 2022 e o CBLOL Academy 2° Split 2023. Além disso, chegamos ao Top 4 no CBLOL 2023.",
-    "lol_competitions": "Nossa equipe de LoL compete principalmente no CBLOL (Campeonato Brasileiro de League of Legends) e no CBLOL Academy.",
-    "lol_recent": "Nossa equipe está se preparando para a LTA Sul 2025, com o sorteio marcado para 18 de janeiro de 2025 e início em 25 de janeiro de 2025.",
-    "lol_player_ayu": "Ayu é nosso atirador (ADC), com bom posicionamento e mecânica apurada. Ele mantém um KDA de 5.1, participação em kills de 72% e 540 de dano por minuto.",
-    "lol_player_tutsz": "Tutsz é nosso mid laner versátil com experiência no CBLOL. Ele tem um KDA de 4.3, participação em kills de 68% e 490 de dano por minuto.",
-    "lol_changes": "Em 2025, retornamos à comunicação em português e formamos uma equipe que combina experiência e novos talentos.",
-    "lol_previous": "Na temporada anterior (CBLOL 2024), nosso time era composto por Zzk (Top), Wiz (Jungle), Tutsz (Mid), Ayu (ADC) e JoJo (Support), com Westonway como técnico.",
-    # Valorant
-    "valorant_lineup": "A equipe principal de Valorant da FURIA é composta por khalil, havoc, heat, raafa e pryze.",
-    "valorant_coach": "O head coach da nossa equipe de Valorant é peu, que lidera a comissão técnica.",
-    "valorant_academy": "Temos também um time academy de Valorant formado por Above, Desire, Loss, skz e swag, com ryotzz como treinador.",
-    "valorant_achievements": "No Valorant, fomos campeões do VCT Challengers Brazil em 2021 e finalistas do VCT Brazil Playoffs em 2022. Também alcançamos o Top 8 no VCT Americas 2023.",
-    "valorant_competitions": "Nossa equipe de Valorant compete no VCT Americas e no Challengers BR.",
-    "valorant_player_heat": "heat é um dos nossos principais jogadores de Valorant, com ACS de 240, KDA de 1.25 e 27% de headshot.",
-    "valorant_player_raafa": "raafa traz experiência e liderança ao time de Valorant, com ACS de 210, KDA de 1.30 e 25% de headshot.",
-    "valorant_changes": "Atualmente mwzera está afastado temporariamente por questões de saúde, enquanto heat e raafa trazem experiência e liderança ao time.",
-    # Informações gerais
-    "furia_history": "A FURIA Esports é uma organização brasileira de esportes eletrônicos fundada em 2017. Nos destacamos em modalidades como CS2, League of Legends e Valorant.",
-    "furia_branding": "Nossa identidade visual é caracterizada pelo preto como cor primária e branco como secundária, com a pantera como símbolo e um estilo agressivo e moderno.",
-    "furia_other": "A FURIA já teve times em outras modalidades como Rocket League (último evento: RLCS South America 2022) e Rainbow Six Siege (último evento: Brasileirão R6 2022), que atualmente estão inativos.",
-    # Respostas gerais
-    "default": "Sou o chatbot oficial da FURIA Esports. Posso fornecer informações sobre nossos times de League of Legends, Counter Strike 2 e Valorant. Como posso ajudar você hoje?",
-    "unknown": "Não tenho essa informação específica no momento. Posso ajudar com detalhes sobre nossos times atuais de CS2, League of Legends e Valorant, ou sobre a história da FURIA. O que você gostaria de saber?",
-    "greeting": "E aí! Tudo bem? Sou o bot oficial da FURIA Esports, pronto pra te ajudar com informações sobre nossos times e jogadores. O que você quer saber sobre a pantera? 🐾🖤",
-    "thanks": "Por nada! Sempre à disposição para falar sobre a FURIA. Se tiver mais perguntas, é só chamar! #GoPantera 🖤",
-    "goodbye": "Valeu pela conversa! Se precisar de mais informações sobre a FURIA, é só voltar. #SomosFURIA 🐾",
-}
-
-# Lista de palavras-chave e frases para identificar intenções
-INTENT_PATTERNS = {
-    # CS2 / Counter Strike
-    "cs2_lineup": [
-        r"(line(\s)?up|elenco|jogadores|integrantes|time).*(cs|counter|cs2)",
-        r"(cs|counter|cs2).*(line(\s)?up|elenco|jogadores|integrantes|time)",
-        r"quem.*(joga|está).*(cs|counter|cs2)",
-        r"quem.*(é|são).*jogadores.*(cs|counter|cs2)",
-    ],
-    "cs2_coach": [
-        r"(técnico|coach|treinador|comissão).*(cs|counter|cs2)",
-        r"(cs|counter|cs2).*(técnico|coach|treinador|comissão)",
-        r"quem.*(treina|comanda).*(cs|counter|cs2)",
-    ],
-    "cs2_achievements": [
-        r"(conquistas|títulos|troféus|vitórias|campeonatos).*(cs|counter|cs2)",
-        r"(cs|counter|cs2).*(conquistas|títulos|troféus|vitórias|campeonatos)",
-        r"(cs|counter|cs2).*(ganhou|venceu|conquistou)",
-    ],
-    "cs2_competitions": [
-        r"(competições|torneios|campeonatos|disputam).*(cs|counter|cs2)",
-        r"(cs|counter|cs2).*(competições|torneios|campeonatos|disputam)",
-    ],
-    "cs2_player_kscerato": [r"kscerato"],
-    "cs2_player_fallen": [r"fallen"],
-    "cs2_player_yuurih": [r"yuurih"],
-    "cs2_recent": [
-        r"(recente|última|recém).*(cs|counter|cs2)",
-        r"(cs|counter|cs2).*(recente|última|recém)",
-        r"como.*(foi|está).*(cs|counter|cs2)",
-    ],
-    "cs2_changes": [
-        r"(mudanças|alterações|trocas|substituições).*(cs|counter|cs2)",
-        r"(cs|counter|cs2).*(mudanças|alterações|trocas|substituições)",
-    ],
-    # League of Legends
-    "lol_lineup": [
-        r"(line(\s)?up|elenco|jogadores|integrantes|time).*(lol|league|legends)",
-        r"(lol|league|legends).*(line(\s)?up|elenco|jogadores|integrantes|time)",
-        r"quem.*(joga|está).*(lol|league|legends)",
-        r"quem.*(é|são).*jogadores.*(lol|league|legends)",
-    ],
-    "lol_coach": [
-        r"(técnico|coach|treinador|comissão).*(lol|league|legends)",
-        r"(lol|league|legends).*(técnico|coach|treinador|comissão)",
-        r"quem.*(treina|comanda).*(lol|league|legends)",
-    ],
-    "lol_achievements": [
-        r"(conquistas|títulos|troféus|vitórias|campeonatos).*(lol|league|legends)",
-        r"(lol|league|legends).*(conquistas|títulos|troféus|vitórias|campeonatos)",
-        r"(lol|league|legends).*(ganhou|venceu|conquistou)",
-    ],
-    "lol_competitions": [
-        r"(competições|torneios|campeonatos|disputam).*(lol|league|legends)",
-        r"(lol|league|legends).*(competições|torneios|campeonatos|disputam)",
-    ],
-    "lol_recent": [
-        r"(recente|última|recém|próxima).*(lol|league|legends)",
-        r"(lol|league|legends).*(recente|última|recém|próxima)",
-        r"como.*(foi|está).*(lol|league|legends)",
-    ],
-    "lol_player_ayu": [r"ayu"],
-    "lol_player_tutsz": [r"tutsz"],
-    "lol_changes": [
-        r"(mudanças|alterações|trocas|substituições).*(lol|league|legends)",
-        r"(lol|league|legends).*(mudanças|alterações|trocas|substituições)",
-    ],
-    "lol_previous": [
-        r"(antiga|anterior|passada|2024).*(lol|league|legends)",
-        r"(lol|league|legends).*(antiga|anterior|passada|2024)",
-    ],
-    # Valorant
-    "valorant_lineup": [
-        r"(line(\s)?up|elenco|jogadores|integrantes|time).*(val|valorant)",
-        r"(val|valorant).*(line(\s)?up|elenco|jogadores|integrantes|time)",
-        r"quem.*(joga|está).*(val|valorant)",
-        r"quem.*(é|são).*jogadores.*(val|valorant)",
-    ],
-    "valorant_coach": [
-        r"(técnico|coach|treinador|comissão).*(val|valorant)",
-        r"(val|valorant).*(técnico|coach|treinador|comissão)",
-        r"quem.*(treina|comanda).*(val|valorant)",
-    ],
-    "valorant_academy": [
-        r"(academy|base|jovem).*(val|valorant)",
-        r"(val|valorant).*(academy|base|jovem)",
-    ],
-    "valorant_achievements": [
-        r"(conquistas|títulos|troféus|vitórias|campeonatos).*(val|valorant)",
-        r"(val|valorant).*(conquistas|títulos|troféus|vitórias|campeonatos)",
-        r"(val|valorant).*(ganhou|venceu|conquistou)",
-    ],
-    "valorant_competitions": [
-        r"(competições|torneios|campeonatos|disputam).*(val|valorant)",
-        r"(val|valorant).*(competições|torneios|campeonatos|disputam)",
-    ],
-    "valorant_player_heat": [r"heat"],
-    "valorant_player_raafa": [r"raafa"],
-    "valorant_changes": [
-        r"(mudanças|alterações|trocas|substituições).*(val|valorant)",
-        r"(val|valorant).*(mudanças|alterações|trocas|substituições)",
-        r"mwzera",
-    ],
-    # Informações gerais
-    "furia_history": [
-        r"(história|fundação|fundada|sobre).*(furia|pantera)",
-        r"quando.*(foi|surgiu|nasceu|criada)",
-        r"quem.*(fundou|criou)",
-    ],
-    "furia_branding": [
-        r"(logo|marca|símbolo|cor|visual|identidade|mascote)",
-        r"pantera",
-    ],
-    "furia_other": [
-        r"(outros|outras).*(jogos|modalidades|esports)",
-        r"(rocket|r6|rainbow|siege)",
-    ],
-    # Respostas gerais
-    "greeting": [
-        r"^(oi|olá|e aí|salve|opa|eae|beleza|tudo bem|como vai)",
-        r"(oi|olá|e aí|salve|opa|eae|beleza)$",
-    ],
-    "thanks": [
-        r"(obrigad|valeu|agradec|thanks|brigad|vlw)",
-        r"(obrigad|valeu|agradec|thanks|brigad|vlw)$",
-    ],
-    "goodbye": [r"^(tchau|adeus|até|flw|falou)", r"(tchau|adeus|até|flw|falou)$"],
-}
-
-
-# Função avançada de fallback para processar perguntas sem usar a OpenAI
-def advanced_fallback_response(query: str) -> str:
-    query_lower = query.lower()
-
-    # Identificar intenções baseadas em padrões de regex
-    matched_intents = []
-
-    for intent, patterns in INTENT_PATTERNS.items():
-        for pattern in patterns:
-            if re.search(pattern, query_lower):
-                matched_intents.append(intent)
-                break
+# Prompt de sistema para o modelo de linguagem
+SYSTEM_PROMPT = (
+    "Você é o chatbot oficial da FURIA Esports. Responda de forma amigável, "
+    "informativa e concisa às perguntas sobre a FURIA, seus times de esports, "
+    "jogadores e competições. Use um tom jovem e entusiasmado, próprio do mundo "
+    "dos esports. Se não souber a resposta com base no contexto fornecido, "
+    "informe educadamente que não tem essa informação específica e ofereça "
+    "redirecionar para outras informações que você possui."
+)
 
-    # Se encontrou correspondências específicas
-    responses = []
-    if matched_intents:
-        for intent in matched_intents:
-            if intent in KNOWLEDGE_BASE:
-                responses.append(KNOWLEDGE_BASE[intent])
-
-    # Verificar palavras-chave gerais se não encontrou correspondências específicas
-    if not responses:
-        # Verificar CS2
-        if any(
-            keyword in query_lower
-            for keyword in ["cs", "cs2", "counter", "counter-strike", "fps"]
-        ):
-            responses.append(KNOWLEDGE_BASE["cs2_lineup"])
 
-        # Verificar LoL
-        elif any(
-            keyword in query_lower for keyword in ["lol", "league", "legends", "moba"]
-        ):
-            responses.append(KNOWLEDGE_BASE["lol_lineup"])
+# Versão do prompt, usada na chave do cache de respostas
+PROMPT_VERSION = hashlib.sha256(SYSTEM_PROMPT.encode("utf-8")).hexdigest()[:16]
+
+
+# Contexto do prompt: apenas os trechos do dataset relevantes para a pergunta.
+# Retorna também os trechos usados, que ficam como dependências no cache.
+def build_prompt_context(
+    snapshot: DataSnapshot, query: str
+) -> Tuple[str, Dependencies]:
+    if not RETRIEVAL_ENABLED:
+        return snapshot.context, None
+    with STAGE_SECONDS.time("context_build"):
+        chunks = snapshot.index.select(query, RETRIEVAL_TOP_K, CONTEXT_TOKEN_BUDGET)
+        return render_context(chunks), frozenset(chunk.path for chunk in chunks)
+
+
+# Chave do cache de respostas para a pergunta, os dados e o modelo atuais
+def cache_key_for(snapshot: DataSnapshot, backend: LLMBackend, query: str) -> CacheKey:
+    return make_cache_key(
+        query, snapshot.version, f"{PROMPT_VERSION}:{backend.model_id}"
+    )
+
+
+# Guardar a resposta no cache, a menos que os dados tenham mudado durante a chamada
+def cache_answer(
+    snapshot: DataSnapshot, cache_key: CacheKey, answer: str, dependencies: Dependencies
+) -> None:
+    if data_store.snapshot.version == snapshot.version:
+        answer_cache.set(cache_key, answer, dependencies)
+
+
+# Resposta do fallback local, registrando o motivo e as intenções identificadas
+def fallback_answer(query: str, reason: str) -> str:
+    FALLBACK_TOTAL.inc(reason)
+    with STAGE_SECONDS.time("fallback"):
+        query_lower = query.lower()
+        intents = match_intents(query_lower)
+        answer = build_fallback_response(query_lower, intents)
+    for intent in intents:
+        INTENT_HITS_TOTAL.inc(intent)
+    return answer
+
+
+# Motivo do fallback a partir do erro na chamada ao LLM
+def failure_reason(error: Exception) -> str:
+    if isinstance(error, CircuitOpenError):
+        return "circuit_open"
+    if isinstance(error, OverloadedError):
+        return error.reason
+    if isinstance(error, asyncio.TimeoutError):
+        return "timeout"
+    return "llm_error"
+
+
+# Montar as mensagens enviadas ao modelo (com o histórico da conversa, no chat)
+def build_messages(
+    context: str, query: str, history: Optional[List[Dict[str, str]]] = None
+) -> List[Dict[str, str]]:
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "system", "content": f"Contexto: {context}"},
+        *(history or []),
+        {"role": "user", "content": query},
+    ]
+
+
+# Resposta montada a partir do índice de entidades, ou None se a pergunta
+# precisar do LLM
+def direct_answer(snapshot: DataSnapshot, query: str) -> Optional[str]:
+    if not DIRECT_ANSWERS_ENABLED:
+        return None
+    with STAGE_SECONDS.time("direct_answer"):
+        return snapshot.entities.answer(query)
+
+
+# Chamada ao LLM protegida pelo circuit breaker e pelo prazo da requisição
+async def ask_llm(
+    backend: LLMBackend, snapshot: DataSnapshot, query: str, cache_key
+) -> str:
+    if not llm_breaker.allow_request():
+        raise CircuitOpenError("circuito do LLM aberto")
+
+    context, dependencies = build_prompt_context(snapshot, query)
+    try:
+        with STAGE_SECONDS.time("llm"):
+            completion = await asyncio.wait_for(
+                backend.complete(build_messages(context, query)),
+                timeout=LLM_DEADLINE,
+            )
+    except OverloadedError:
+        # Recusada antes de chegar ao upstream: não conta como falha do LLM
+        raise
+    except Exception:
+        llm_breaker.record_failure()
+        raise
+    llm_breaker.record_success()
+    LLM_TOKENS_TOTAL.inc(backend.name, "prompt", amount=completion.prompt_tokens)
+    LLM_TOKENS_TOTAL.inc(
+        backend.name, "completion", amount=completion.completion_tokens
+    )
+
+    cache_answer(snapshot, cache_key, completion.text, dependencies)
+    return completion.text
+
+
+# Consumir o resultado de uma chamada que ninguém mais espera (evita avisos do asyncio)
+def discard_task_result(task: "asyncio.Future[Any]") -> None:
+    if not task.cancelled() and task.exception() is not None:
+        print(f"Erro na comunicação com o LLM (segundo plano): {task.exception()!r}")
+
+
+# Responder uma pergunta: cache, LLM ou fallback. Retorna (resposta, origem).
+# Com cache_checked=True o cache não é consultado de novo (quem chamou já
+# consultou e não achou a resposta).
+async def answer_query(query: str, cache_checked: bool = False) -> Tuple[str, str]:
+    try:
+        # Perguntas factuais simples saem direto do dataset
+        direct = direct_answer(data_store.snapshot, query)
+        if direct is not None:
+            return direct, "direct"
 
-        # Verificar Valorant
-        elif any(keyword in query_lower for keyword in ["val", "valorant"]):
-            responses.append(KNOWLEDGE_BASE["valorant_lineup"])
+        # Tentar usar o LLM se houver um backend configurado
+        backend = app.state.llm
 
-        # Resposta padrão se nada for identificado
-        else:
-            responses.append(KNOWLEDGE_BASE["default"])
+        if backend is not None:
+            try:
+                # Usar os dados e o contexto já carregados em memória
+                snapshot = data_store.snapshot
+                if not snapshot.data:
+                    raise HTTPException(
+                        status_code=500,
+                        detail="Não foi possível carregar os dados da FURIA",
+                    )
 
-    # Combinar respostas (limite a 2 para não ficar muito longo)
-    if len(responses) > 2:
-        responses = responses[:2]
+                # Perguntas repetidas são respondidas direto do cache
+                cache_key = cache_key_for(snapshot, backend, query)
+                cached_answer = None if cache_checked else answer_cache.get(cache_key)
+                if cached_answer is not None:
+                    return cached_answer, "cache"
 
-    # Formatar resposta final
-    response = " ".join(responses)
+                llm_call = asyncio.ensure_future(
+                    llm_flight.do(
+                        cache_key,
+                        lambda: ask_llm(backend, snapshot, query, cache_key),
+                    )
+                )
+                if LLM_HEDGE_AFTER > 0:
+                    done, _ = await asyncio.wait({llm_call}, timeout=LLM_HEDGE_AFTER)
+                    if not done:
+                        # LLM atrasado: responde com o fallback sem cancelar a
+                        # chamada, que termina em segundo plano e alimenta o cache
+                        llm_call.add_done_callback(discard_task_result)
+                        return fallback_answer(query, "hedged"), "fallback"
+
+                return await llm_call, "llm"
+
+            except HTTPException:
+                return fallback_answer(query, "no_data"), "fallback"
+            except Exception as e:
+                # Com a política "reject", a sobrecarga vira 503 no endpoint
+                if isinstance(e, OverloadedError) and LLM_OVERLOAD_POLICY == "reject":
+                    raise
+                # LLM falhando recentemente (circuito aberto), sobrecarregado ou erro na API
+                if not isinstance(e, (CircuitOpenError, OverloadedError)):
+                    print(f"Erro na comunicação com o LLM: {e!r}")
+                return fallback_answer(query, failure_reason(e)), "fallback"
+        else:
+            # Usar o fallback avançado se não tiver API key
+            return fallback_answer(query, "no_backend"), "fallback"
 
-    return response
+    except OverloadedError:
+        raise
+    except Exception as e:
+        print(f"Erro no processamento da consulta: {e}")
+        return KNOWLEDGE_BASE["default"], "default"
 
 
 # Endpoint para processar consultas ao bot
 @app.post("/query")
 async def process_query(query: Query):
     try:
-        # Tentar usar OpenAI se a chave estiver disponível
-        api_key = os.environ.get("OPENAI_API_KEY")
+        answer, source = await answer_query(query.query)
+    except OverloadedError as e:
+        ANSWERS_TOTAL.inc("/query", "rejected")
+        return overloaded_response(e.retry_after)
+    ANSWERS_TOTAL.inc("/query", source)
+    return {"answer": answer}
+
+
+# Resposta 503 para quando o LLM está sobrecarregado e a política é "reject"
+def overloaded_response(retry_after: int) -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={
+            "detail": "Muitas perguntas ao mesmo tempo. Tente novamente em instantes."
+        },
+        headers={"Retry-After": str(retry_after)},
+    )
+
+
+# Resposta imediata de um item do lote: direta ou do cache (None se precisar do LLM)
+def quick_answer(query: str) -> Optional[Tuple[str, str]]:
+    snapshot = data_store.snapshot
+    direct = direct_answer(snapshot, query)
+    if direct is not None:
+        return direct, "direct"
+    backend = app.state.llm
+    if backend is not None and snapshot.data:
+        cache_key = cache_key_for(snapshot, backend, query)
+        cached_answer = answer_cache.get(cache_key)
+        if cached_answer is not None:
+            return cached_answer, "cache"
+    return None
+
+
+# Resposta de um item do lote pelo caminho normal; com a política "reject",
+# a sobrecarga vira fallback (o lote não é recusado por causa de um item).
+# Só recebe os itens em que quick_answer já consultou o cache.
+async def batch_answer(query: str) -> Tuple[str, str]:
+    try:
+        return await answer_query(query, cache_checked=True)
+    except OverloadedError as e:
+        return fallback_answer(query, e.reason), "fallback"
+
+
+# Lote de perguntas; com stream=true os resultados saem em NDJSON, na ordem
+# em que ficam prontos (cada linha traz a posição "index" na entrada)
+class BatchQuery(BaseModel):
+    queries: List[str]
+    stream: bool = False
+
+
+@app.post("/query/batch")
+async def process_query_batch(batch: BatchQuery):
+    if len(batch.queries) > BATCH_MAX_QUERIES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"O lote aceita no máximo {BATCH_MAX_QUERIES} perguntas.",
+        )
+
+    if not batch.stream:
+        results = await answer_batch(
+            batch.queries, batch_answer, BATCH_LLM_CONCURRENCY, quick_answer
+        )
+        for result in results:
+            ANSWERS_TOTAL.inc("/query/batch", result["source"])
+        return {"results": results}
 
-        if api_key and not api_key.strip() == "":
+    async def lines() -> AsyncIterator[str]:
+        async for result in run_batch(
+            batch.queries, batch_answer, BATCH_LLM_CONCURRENCY, quick_answer
+        ):
+            for index in result.indexes:
+                ANSWERS_TOTAL.inc("/query/batch", result.source)
+                item = {
+                    "index": index,
+                    "query": batch.queries[index],
+                    "answer": result.answer,
+                    "source": result.source,
+                }
+                yield json.dumps(item, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+# Formatar um evento no padrão Server-Sent Events
+def sse_event(payload: Dict[str, Any], event: Optional[str] = None) -> str:
+    data = json.dumps(payload, ensure_ascii=False)
+    if event:
+        return f"event: {event}\ndata: {data}\n\n"
+    return f"data: {data}\n\n"
+
+
+# Quebrar uma resposta pronta em pedaços (palavra + espaço) para o streaming
+def split_answer(answer: str) -> List[str]:
+    return [piece for piece in re.split(r"(?<=\s)", answer) if piece]
+
+
+# Gerar a resposta em pedaços: ("token", {"token": ...}) conforme chegam do LLM
+# ou, se não for possível, da resposta pronta, e um evento final ("done" ou
+# "error"). Usado pelo SSE e pelo WebSocket.
+# Com histórico (chat), a pergunta vai ao modelo junto com a conversa e não usa
+# o cache; lookup_query é a versão usada nas buscas (resposta direta, contexto
+# e fallback).
+async def answer_events(
+    query: str,
+    endpoint: str,
+    history: Optional[List[Dict[str, str]]] = None,
+    lookup_query: Optional[str] = None,
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    backend = app.state.llm
+    snapshot = data_store.snapshot
+    lookup_query = lookup_query or query
+
+    direct = direct_answer(snapshot, lookup_query)
+    if direct is not None:
+        ANSWERS_TOTAL.inc(endpoint, "direct")
+        for piece in split_answer(direct):
+            yield "token", {"token": piece}
+        yield "done", {"source": "direct"}
+        return
+
+    if backend is not None and snapshot.data:
+        cache_key = None
+        if not history:
+            cache_key = cache_key_for(snapshot, backend, query)
+            cached_answer = answer_cache.get(cache_key)
+            if cached_answer is not None:
+                ANSWERS_TOTAL.inc(endpoint, "cache")
+                for piece in split_answer(cached_answer):
+                    yield "token", {"token": piece}
+                yield "done", {"source": backend.name, "cached": True}
+                return
+
+        sent_tokens = False
+        tokens: List[str] = []
+        try:
+            if not llm_breaker.allow_request():
+                raise CircuitOpenError("circuito do LLM aberto")
+            context, dependencies = build_prompt_context(snapshot, lookup_query)
+            stream = backend.stream(build_messages(context, query, history))
+            started = time.perf_counter()
             try:
-                # Carregar dados e gerar contexto
-                furia_data = load_furia_data()
-                if not furia_data:
-                    raise HTTPException(
-                        status_code=500,
-                        detail="Não foi possível carregar os dados da FURIA",
+                try:
+                    # O prazo vale até o primeiro token
+                    first_token = await asyncio.wait_for(
+                        stream.__anext__(), timeout=LLM_DEADLINE
                     )
+                except StopAsyncIteration:
+                    first_token = ""
+                except OverloadedError:
+                    raise
+                except Exception:
+                    llm_breaker.record_failure()
+                    raise
+                llm_breaker.record_success()
+                STAGE_SECONDS.observe(time.perf_counter() - started, "llm_first_token")
+
+                if first_token:
+                    sent_tokens = True
+                    tokens.append(first_token)
+                    yield "token", {"token": first_token}
+                async for token in stream:
+                    sent_tokens = True
+                    tokens.append(token)
+                    yield "token", {"token": token}
+            finally:
+                await stream.aclose()
+            STAGE_SECONDS.observe(time.perf_counter() - started, "llm")
+            if cache_key is not None:
+                cache_answer(snapshot, cache_key, "".join(tokens), dependencies)
+            ANSWERS_TOTAL.inc(endpoint, "llm")
+            yield "done", {"source": backend.name}
+            return
+        except Exception as e:
+            if isinstance(e, OverloadedError) and LLM_OVERLOAD_POLICY == "reject":
+                ANSWERS_TOTAL.inc(endpoint, "rejected")
+                yield "error", {
+                    "detail": "Muitas perguntas ao mesmo tempo. Tente novamente em instantes.",
+                    "retry_after": e.retry_after,
+                }
+                return
+            if not isinstance(e, (CircuitOpenError, OverloadedError)):
+                print(f"Erro na comunicação com o LLM (streaming): {e!r}")
+            # Se parte da resposta já foi enviada, não dá para trocar de fonte
+            if sent_tokens:
+                ANSWERS_TOTAL.inc(endpoint, "error")
+                yield "error", {
+                    "detail": "A resposta foi interrompida. Tente novamente."
+                }
+                return
+            reason = failure_reason(e)
+    elif backend is None:
+        reason = "no_backend"
+    else:
+        reason = "no_data"
 
-                context = generate_context(furia_data)
-
-                # Configurar o prompt para o modelo OpenAI
-                system_prompt = (
-                    "Você é o chatbot oficial da FURIA Esports. Responda de forma amigável, "
-                    "informativa e concisa às perguntas sobre a FURIA, seus times de esports, "
-                    "jogadores e competições. Use um tom jovem e entusiasmado, próprio do mundo "
-                    "dos esports. Se não souber a resposta com base no contexto fornecido, "
-                    "informe educadamente que não tem essa informação específica e ofereça "
-                    "redirecionar para outras informações que você possui."
+    try:
+        answer = fallback_answer(lookup_query, reason)
+    except Exception as e:
+        print(f"Erro no processamento da consulta: {e}")
+        answer = KNOWLEDGE_BASE["default"]
+    ANSWERS_TOTAL.inc(endpoint, "fallback")
+
+    for piece in split_answer(answer):
+        yield "token", {"token": piece}
+    yield "done", {"source": "fallback"}
+
+
+# Eventos da resposta no formato Server-Sent Events
+async def stream_answer(query: str) -> AsyncIterator[str]:
+    async for event, payload in answer_events(query, "/query/stream"):
+        yield sse_event(payload, event=None if event == "token" else event)
+
+
+# Endpoint de streaming: envia a resposta token a token via SSE
+@app.post("/query/stream")
+async def process_query_stream(query: Query):
+    # Com a fila já cheia, recusa antes de abrir o stream (depois o status não
+    # muda mais), a menos que a resposta não dependa do LLM
+    backend = app.state.llm
+    if (
+        LLM_OVERLOAD_POLICY == "reject"
+        and backend is not None
+        and backend.admission.is_full()
+    ):
+        snapshot = data_store.snapshot
+        cache_key = cache_key_for(snapshot, backend, query.query)
+        # Só verifica: a busca que conta nas estatísticas é a do stream
+        if (
+            direct_answer(snapshot, query.query) is None
+            and answer_cache.get(cache_key, count=False) is None
+        ):
+            ANSWERS_TOTAL.inc("/query/stream", "rejected")
+            return overloaded_response(backend.admission.retry_after())
+    return StreamingResponse(
+        stream_answer(query.query),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# Pergunta de uma mensagem de texto do WebSocket: {"query": "..."}, uma
+# string JSON ("...") ou o texto puro
+def websocket_query(text: str) -> str:
+    try:
+        payload = json.loads(text)
+    except ValueError:
+        return text.strip()
+    if isinstance(payload, dict):
+        query = payload.get("query")
+        return query.strip() if isinstance(query, str) else ""
+    if isinstance(payload, str):
+        return payload.strip()
+    return text.strip()
+
+
+# Chat por WebSocket: uma conexão por usuário, com histórico da conversa.
+# O cliente envia {"query": "..."} (ou o texto puro) e recebe
+# {"type": "token", "token": ...} e, ao final, {"type": "done", "source": ...}
+# ou {"type": "error", "detail": ...}. Mensagens binárias recebem um erro.
+@app.websocket("/ws/chat")
+async def chat_websocket(websocket: WebSocket):
+    await websocket.accept()
+    session = ChatSession()
+    chat_sessions.add(session)
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("text") is None:
+                await websocket.send_json(
+                    {"type": "error", "detail": "Envie a pergunta como texto."}
                 )
+                continue
+            query = websocket_query(message["text"])
+            if not query:
+                await websocket.send_json(
+                    {"type": "error", "detail": "Mensagem vazia."}
+                )
+                continue
+
+            started = time.perf_counter()
+            lookup_query = session.resolve(query, data_store.snapshot.entities)
+            tokens: List[str] = []
+            async for event, payload in answer_events(
+                query, "/ws/chat", session.history(), lookup_query
+            ):
+                if event == "token":
+                    tokens.append(payload["token"])
+                await websocket.send_json({"type": event, **payload})
+                if event == "done":
+                    session.add_exchange(query, "".join(tokens))
+            REQUEST_SECONDS.observe(time.perf_counter() - started, "/ws/chat")
+    except WebSocketDisconnect:
+        pass
+    finally:
+        chat_sessions.discard(session)
+
+
+# Autenticação da API de administração: "Authorization: Bearer <ADMIN_TOKEN>".
+# Sem ADMIN_TOKEN configurado, a API fica desativada.
+def require_admin(authorization: Optional[str] = Header(None)) -> None:
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="API de administração desativada")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(
+        token.strip().encode(), ADMIN_TOKEN.encode()
+    ):
+        raise HTTPException(
+            status_code=401,
+            detail="Token de administração inválido",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
 
-                client = OpenAI(api_key=api_key)
 
-                # Fazer requisição para a OpenAI
-                completion = client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "system", "content": f"Contexto: {context}"},
-                        {"role": "user", "content": query.query},
-                    ],
-                )
+# Alteração de um trecho do dataset. O caminho pode ser "A.B.C" ou uma lista
+# de chaves (para chaves com ponto); com delete=true o valor é removido.
+class DataPatch(BaseModel):
+    path: Union[List[str], str]
+    value: Any = None
+    delete: bool = False
 
-                # Extrair a resposta
-                answer = completion.choices[0].message.content
 
-                return {"answer": answer}
+def parse_data_path(path: Union[List[str], str]) -> Tuple[str, ...]:
+    return tuple(path.split(".")) if isinstance(path, str) else tuple(path)
 
-            except Exception as e:
-                print(f"Erro na comunicação com OpenAI: {e}")
-                # Cair no fallback se houver erro na API
-                return {"answer": advanced_fallback_response(query.query)}
-        else:
-            # Usar o fallback avançado se não tiver API key
-            return {"answer": advanced_fallback_response(query.query)}
 
-    except Exception as e:
-        print(f"Erro no processamento da consulta: {e}")
-        return {"answer": KNOWLEDGE_BASE["default"]}
+# Ler um trecho do dataset em uso
+@app.get("/admin/data", dependencies=[Depends(require_admin)])
+async def read_data(path: str = ""):
+    value: Any = data_store.snapshot.data
+    for key in parse_data_path(path) if path else ():
+        if not isinstance(value, dict) or key not in value:
+            raise HTTPException(
+                status_code=404, detail=f"Caminho não encontrado: {path}"
+            )
+        value = value[key]
+    return {"path": path, "value": value, "version": data_store.snapshot.version}
+
+
+# Alterar um trecho do dataset: valida, grava o arquivo e refaz só o que
+# depende da seção alterada (contexto, índice de busca e cache)
+@app.patch("/admin/data", dependencies=[Depends(require_admin)])
+async def patch_data(patch: DataPatch):
+    path = parse_data_path(patch.path)
+    if not patch.delete and "value" not in patch.__fields_set__:
+        raise HTTPException(
+            status_code=422, detail=["Informe value (ou delete=true para remover)"]
+        )
+    try:
+        snapshot = await asyncio.to_thread(
+            data_store.apply_patch, path, patch.value, patch.delete
+        )
+    except DataPatchError as e:
+        raise HTTPException(status_code=409 if e.conflict else 422, detail=e.errors)
+    return {
+        "version": snapshot.version,
+        "changed_sections": [
+            ".".join(section) for section in sorted(snapshot.changed or ())
+        ],
+        "cache": answer_cache.stats(),
+    }
+
+
+# Backend de LLM em uso e estado do circuit breaker
+@app.get("/llm/status")
+async def llm_status():
+    backend = app.state.llm
+    return {
+        "backend": backend.name if backend else None,
+        "model": backend.model if backend else None,
+        "breaker": llm_breaker.stats(),
+        "admission": llm_admission_stats(),
+        "single_flight": llm_flight.stats(),
+    }
+
+
+# Contadores do cache de respostas (acertos, falhas, tamanho)
+@app.get("/cache/stats")
+async def cache_stats():
+    return answer_cache.stats()
+
+
+# Métricas no formato do Prometheus
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
 
 
 # Rota para verificar a saúde do serviço
@@ -462,6 +941,26 @@ async def health_check():
     return {"status": "ok"}
 
 
+# Prontidão: 503 até os dados estarem carregados, os caminhos de resposta
+# aquecidos e a conexão com o LLM aberta. O /health só indica que o processo
+# está no ar.
+@app.get("/ready")
+async def readiness_check():
+    checks = readiness_checks()
+    ready = all(checks.values())
+    return JSONResponse(
+        {
+            "status": "ready" if ready else "starting",
+            "checks": checks,
+            "startup_ms": {
+                step: round(seconds * 1000, 1)
+                for step, seconds in startup_timings.items()
+            },
+        },
+        status_code=200 if ready else 503,
+    )
+
+
 # Iniciar o servidor se este arquivo for executado diretamente
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,239 @@
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+# Métricas no formato texto do Prometheus, sem dependências externas.
+# As atualizações são feitas sem lock: cada operação é uma soma em um dicionário,
+# o que é suficiente para contadores de observabilidade.
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+# Contador crescente; pode ser lido na hora da coleta por uma função
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        function: Optional[Callable[[], Dict[LabelValues, float]]] = None,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._function = function
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> Iterator[str]:
+        values = self._function() if self._function else self._values
+        for labels, value in sorted(values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+# Valor instantâneo; pode ser calculado na hora da coleta por uma função
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        function: Optional[Callable[[], Dict[LabelValues, float]]] = None,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._function = function
+
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def samples(self) -> Iterator[str]:
+        values = self._function() if self._function else self._values
+        for labels, value in sorted(values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Por combinação de labels: [contagem por bucket..., +Inf], soma
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        counts = self._counts.get(labels)
+        if counts is None:
+            counts = self._counts[labels] = [0] * (len(self.buckets) + 1)
+            self._sums[labels] = 0.0
+        counts[bisect_left(self.buckets, value)] += 1
+        self._sums[labels] += value
+
+    # Mede o tempo do bloco: with histogram.time("llm"): ...
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def samples(self) -> Iterator[str]:
+        for labels, counts in sorted(self._counts.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                bucket_labels = _format_labels(self.labelnames, labels, le)
+                yield f"{self.name}_bucket{bucket_labels} {cumulative}"
+            label_text = _format_labels(self.labelnames, labels)
+            yield f"{self.name}_sum{label_text} {_format_value(self._sums[labels])}"
+            yield f"{self.name}_count{label_text} {cumulative}"
+
+
+M = TypeVar("M", bound=Metric)
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[Metric] = []
+
+    def register(self, metric: M) -> M:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+# Tempo de cada etapa do processamento de uma pergunta
+STAGE_SECONDS = REGISTRY.register(
+    Histogram(
+        "furia_stage_seconds",
+        "Tempo de cada etapa (data_load, context_build, llm, fallback) em segundos.",
+        ["stage"],
+    )
+)
+REQUEST_SECONDS = REGISTRY.register(
+    Histogram(
+        "furia_request_seconds",
+        "Tempo total das requisições em segundos.",
+        ["endpoint"],
+    )
+)
+# De onde veio a resposta: llm, cache, fallback ou default (erro inesperado)
+ANSWERS_TOTAL = REGISTRY.register(
+    Counter(
+        "furia_answers_total",
+        "Respostas enviadas por endpoint e origem.",
+        ["endpoint", "source"],
+    )
+)
+FALLBACK_TOTAL = REGISTRY.register(
+    Counter("furia_fallback_total", "Respostas do fallback por motivo.", ["reason"])
+)
+INTENT_HITS_TOTAL = REGISTRY.register(
+    Counter(
+        "furia_intent_hits_total", "Intenções identificadas pelo fallback.", ["intent"]
+    )
+)
+LLM_TOKENS_TOTAL = REGISTRY.register(
+    Counter("furia_llm_tokens_total", "Tokens consumidos no LLM.", ["backend", "kind"])
+)
+LLM_QUEUE_WAIT_SECONDS = REGISTRY.register(
+    Histogram(
+        "furia_llm_queue_wait_seconds",
+        "Tempo de espera na fila do controle de admissão do LLM em segundos.",
+        ["backend"],
+    )
+)
+DATA_RELOADS_TOTAL = REGISTRY.register(
+    Counter("furia_data_reloads_total", "Novas versões do dataset carregadas.")
+)
+DATA_PATCHES_TOTAL = REGISTRY.register(
+    Counter(
+        "furia_data_patches_total",
+        "Alterações do dataset feitas pela API de administração.",
+    )
+)
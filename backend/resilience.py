@@ -0,0 +1,180 @@
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict
+
+
+# Erro levantado quando o circuito está aberto e a chamada nem é tentada
+class CircuitOpenError(Exception):
+    pass
+
+
+# Erro levantado quando a fila de espera do LLM está cheia ou a espera passou
+# do limite. retry_after é uma estimativa (segundos) de quando tentar de novo.
+class OverloadedError(Exception):
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"LLM sobrecarregado ({reason})")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+# Circuit breaker para o LLM: depois de falhas seguidas (erros ou estouro do
+# prazo) o circuito abre e as requisições vão direto para o fallback. Passado
+# reset_timeout, algumas chamadas de teste (half-open) verificam se o serviço voltou.
+# Usado apenas dentro do event loop, então não precisa de lock.
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.half_open_calls = 0
+        self.probe_started = 0.0
+        self.rejected = 0
+        self.trips = 0
+
+    # Verifica se uma chamada pode ser feita agora
+    def allow_request(self) -> bool:
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.rejected += 1
+                return False
+            self.state = self.HALF_OPEN
+            self.half_open_calls = 0
+
+        if self.state == self.HALF_OPEN:
+            now = time.monotonic()
+            if self.half_open_calls >= self.half_open_max_calls:
+                # Se a chamada de teste se perdeu (ex.: cancelada), libera outra
+                if now - self.probe_started < self.reset_timeout:
+                    self.rejected += 1
+                    return False
+                self.half_open_calls = 0
+            self.half_open_calls += 1
+            self.probe_started = now
+
+        return True
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        self.state = self.CLOSED
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if (
+            self.state == self.HALF_OPEN
+            or self.consecutive_failures >= self.failure_threshold
+        ):
+            if self.state != self.OPEN:
+                self.trips += 1
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "reset_timeout": self.reset_timeout,
+            "trips": self.trips,
+            "rejected": self.rejected,
+        }
+
+
+# Controle de admissão das chamadas ao LLM: no máximo max_concurrency chamadas
+# ao mesmo tempo e até max_queue esperando a vez, em ordem de chegada. Quem
+# encontra a fila cheia, ou espera mais que max_wait segundos, recebe
+# OverloadedError em vez de acumular chamadas (e memória) atrás do upstream.
+# Usado apenas dentro do event loop, então não precisa de lock.
+class AdmissionController:
+    def __init__(
+        self, max_concurrency: int, max_queue: int = 64, max_wait: float = 2.0
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected: Dict[str, int] = {"queue_full": 0, "queue_timeout": 0}
+        # Média móvel do tempo de cada chamada, para estimar o Retry-After
+        self.average_hold = 1.0
+        self._waiters: Deque["asyncio.Future[None]"] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def is_full(self) -> bool:
+        return self.in_flight >= self.max_concurrency and self.queued >= self.max_queue
+
+    def retry_after(self) -> int:
+        rounds = (self.queued + 1) / max(1, self.max_concurrency)
+        return max(1, math.ceil(rounds * self.average_hold))
+
+    def _reject(self, reason: str) -> OverloadedError:
+        self.rejected[reason] += 1
+        return OverloadedError(reason, self.retry_after())
+
+    # Esperar uma vaga. Retorna o tempo de espera na fila, em segundos.
+    async def acquire(self) -> float:
+        if self.in_flight < self.max_concurrency and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return 0.0
+        if self.queued >= self.max_queue:
+            raise self._reject("queue_full")
+
+        waiter: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(
+                waiter, timeout=self.max_wait if self.max_wait > 0 else None
+            )
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # A vaga chegou junto com o cancelamento: devolve para o próximo
+                self.release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                raise self._reject("queue_timeout") from None
+            raise
+        # A vaga foi transferida por release(), que já manteve in_flight
+        self.admitted += 1
+        return time.monotonic() - started
+
+    # Liberar a vaga, passando-a direto para o primeiro da fila
+    def release(self, held: float = 0.0) -> None:
+        if held > 0:
+            self.average_hold = 0.8 * self.average_hold + 0.2 * held
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "max_wait": self.max_wait,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "average_call_seconds": round(self.average_hold, 3),
+        }
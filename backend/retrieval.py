@@ -0,0 +1,401 @@
+import math
+from collections import Counter, defaultdict
+from typing import Any, Collection, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from cache import normalize_query
+
+CONTEXT_HEADER = "Informações sobre a FURIA Esports:\n\n"
+
+# Nomes legíveis para as chaves do JSON
+SECTION_LABELS = {
+    "League_of_Legends": "League of Legends",
+    "Counter_Strike_2": "Counter Strike 2",
+    "Counter-Strike": "Counter-Strike",
+    "Valorant": "Valorant",
+    "lineup": "Lineup atual",
+    "coaching_staff": "Comissão técnica",
+    "latest_competition": "Competição recente",
+    "previous_lineup_CBLOL_2024": "Lineup anterior (CBLOL 2024)",
+    "players_bio": "Bio",
+    "notes": "Notas",
+    "academy_team": "Time academy",
+    "branding": "Identidade visual",
+    "historical_titles": "Conquistas históricas",
+    "statistics": "Estatísticas",
+    "other_modalities": "Outras modalidades",
+}
+
+# Palavras muito comuns ignoradas na pergunta
+STOPWORDS = frozenset(
+    "a o e é os as de do da dos das no na nos nas em um uma que qual quais quem "
+    "como quando onde me fala sobre pra para por com se ja eh".split()
+)
+
+# Sinônimos usados pelos fãs, expandidos na pergunta antes da busca
+QUERY_SYNONYMS = {
+    "cs": ["counter", "strike"],
+    "cs2": ["counter", "strike"],
+    "csgo": ["counter", "strike"],
+    "lol": ["league", "legends"],
+    "val": ["valorant"],
+    "tecnico": ["coach", "comissao"],
+    "treinador": ["coach", "comissao"],
+    "treina": ["coach"],
+    "coach": ["comissao"],
+    "elenco": ["lineup"],
+    "jogadores": ["lineup"],
+    "integrantes": ["lineup"],
+    "time": ["lineup"],
+    "joga": ["lineup"],
+    "titulos": ["conquistas"],
+    "trofeus": ["conquistas"],
+    "campeao": ["conquistas"],
+    "ganhou": ["conquistas"],
+    "venceu": ["conquistas"],
+    "stats": ["estatisticas"],
+    "desempenho": ["estatisticas"],
+    "hs": ["headshot"],
+    "logo": ["identidade", "visual"],
+    "cor": ["identidade", "visual"],
+    "uniforme": ["identidade", "visual"],
+    "campeonato": ["competicao", "latest", "competition"],
+    "campeonatos": ["competicao", "latest", "competition"],
+    "torneio": ["competicao", "latest", "competition"],
+    "torneios": ["competicao", "latest", "competition"],
+    "competicoes": ["competicao", "latest", "competition"],
+    "proximo": ["latest", "competition"],
+    "proxima": ["latest", "competition"],
+    "ultimo": ["latest", "competition"],
+    "ultima": ["latest", "competition"],
+    "anterior": ["previous"],
+    "passado": ["previous"],
+}
+
+
+def label(key: str) -> str:
+    return SECTION_LABELS.get(key, key.replace("_", " "))
+
+
+# Termos de busca: texto normalizado, separando também as chaves com "_"
+def tokenize(text: str) -> List[str]:
+    return normalize_query(text.replace("_", " ")).split()
+
+
+# Estimativa simples de tokens do modelo (~4 caracteres por token)
+def estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+# Converter um valor do JSON em texto legível
+def render_value(value: Any, indent: str = "") -> str:
+    if isinstance(value, dict):
+        lines = []
+        for key, item in value.items():
+            if isinstance(item, (dict, list)) and item and not _is_flat_list(item):
+                lines.append(f"{indent}- {key}:\n{render_value(item, indent + '  ')}")
+            else:
+                lines.append(f"{indent}- {key}: {render_value(item)}")
+        return "\n".join(lines)
+    if isinstance(value, list):
+        if _is_flat_list(value):
+            return ", ".join(str(item) for item in value)
+        return "\n".join(render_value(item, indent) for item in value)
+    return str(value)
+
+
+def _is_flat_list(value: Any) -> bool:
+    return isinstance(value, list) and all(
+        not isinstance(item, (dict, list)) for item in value
+    )
+
+
+# Trecho do dataset que pode ser enviado ao modelo
+class Chunk(NamedTuple):
+    path: Tuple[
+        str, ...
+    ]  # caminho no JSON (ex.: ("FURIA_Esports_2025", "Valorant", "lineup"))
+    text: str
+    tokens: int
+
+
+ChunkPath = Tuple[str, ...]
+ROOT = "FURIA_Esports_2025"
+# Seções com um trecho por jogo/jogador, atualizadas por jogo
+PER_GAME_SECTIONS = ("statistics", "historical_titles")
+
+
+# Seção do dataset a que um caminho pertence: a unidade que é atualizada e
+# invalidada junto (ex.: ("FURIA_Esports_2025", "Counter_Strike_2") ou
+# ("FURIA_Esports_2025", "statistics", "Valorant"))
+def section_of(path: ChunkPath) -> ChunkPath:
+    if not path or path[0] != ROOT:
+        return path[:2] if path[:1] == ("times",) else path[:1]
+    if len(path) > 1 and path[1] in PER_GAME_SECTIONS:
+        return path[:3]
+    return path[:2]
+
+
+# Dois caminhos se sobrepõem se um é prefixo do outro
+def overlaps(path: ChunkPath, other: ChunkPath) -> bool:
+    size = min(len(path), len(other))
+    return path[:size] == other[:size]
+
+
+def make_chunk(path: Tuple[str, ...], title: str, body: str) -> Chunk:
+    text = f"{title}:\n{body}\n"
+    return Chunk(path, text, estimate_tokens(text))
+
+
+# Dividir o dataset em trechos por time, jogador e assunto
+def build_chunks(furia_data: Dict[str, Any]) -> List[Chunk]:
+    chunks: List[Chunk] = []
+
+    # Formato antigo do arquivo (info, times, competicoes)
+    if "info" in furia_data:
+        info = furia_data["info"]
+        chunks.append(
+            make_chunk(
+                ("info",),
+                "Sobre a FURIA",
+                f"Sobre: {info.get('sobre', '')}\nFundada em: {info.get('fundada', '')}",
+            )
+        )
+    for jogo, info in furia_data.get("times", {}).items():
+        chunks.append(
+            make_chunk(("times", jogo), f"Time de {jogo}", render_value(info))
+        )
+    if "competicoes" in furia_data:
+        body = "\n".join(
+            f"- {comp.get('nome', '')}: {comp.get('resultado', '')}"
+            for comp in furia_data["competicoes"]
+        )
+        chunks.append(make_chunk(("competicoes",), "Principais Competições", body))
+
+    for section, content in furia_data.get(ROOT, {}).items():
+        chunks.extend(_section_chunks((ROOT, section), content))
+
+    return chunks
+
+
+# Trechos do dataset que ficam dentro de um caminho (ex.: só os de uma seção)
+def chunks_under(furia_data: Dict[str, Any], prefix: ChunkPath) -> List[Chunk]:
+    if prefix and prefix[0] == ROOT and len(prefix) > 1:
+        content = furia_data.get(ROOT, {})
+        if prefix[1] not in content:
+            return []
+        chunks = list(_section_chunks(prefix[:2], content[prefix[1]]))
+    elif prefix and prefix[0] == ROOT:
+        chunks = [
+            chunk
+            for section, content in furia_data.get(ROOT, {}).items()
+            for chunk in _section_chunks((ROOT, section), content)
+        ]
+    else:
+        chunks = build_chunks(
+            {key: value for key, value in furia_data.items() if key != ROOT}
+        )
+    return [chunk for chunk in chunks if overlaps(chunk.path, prefix)]
+
+
+# Ordem das seções numa reconstrução completa do índice (a mesma de build_chunks)
+def section_order(furia_data: Dict[str, Any]) -> List[ChunkPath]:
+    order: List[ChunkPath] = []
+    if "info" in furia_data:
+        order.append(("info",))
+    order.extend(("times", jogo) for jogo in furia_data.get("times", {}))
+    if "competicoes" in furia_data:
+        order.append(("competicoes",))
+    for section, content in furia_data.get(ROOT, {}).items():
+        if section in PER_GAME_SECTIONS and isinstance(content, dict):
+            order.extend((ROOT, section, game) for game in content)
+        else:
+            order.append((ROOT, section))
+    return order
+
+
+def _section_chunks(path: Tuple[str, ...], content: Any) -> Iterator[Chunk]:
+    section = path[-1]
+
+    # Estatísticas e títulos: um trecho por jogador / por jogo
+    if section == "statistics" and isinstance(content, dict):
+        for game, players in content.items():
+            for player, stats in players.items():
+                yield make_chunk(
+                    path + (game, player),
+                    f"Estatísticas de {player} ({label(game)})",
+                    render_value(stats),
+                )
+        return
+    if section == "historical_titles" and isinstance(content, dict):
+        for game, titles in content.items():
+            body = "\n".join(
+                f"- {title.get('year', '')}: {title.get('title', '')}"
+                for title in titles
+            )
+            yield make_chunk(
+                path + (game,), f"Conquistas históricas - {label(game)}", body
+            )
+        return
+
+    # Times e demais seções: um trecho por assunto (lineup, comissão técnica...)
+    if isinstance(content, dict) and all(
+        isinstance(item, dict) for item in content.values()
+    ):
+        for key, item in content.items():
+            yield make_chunk(
+                path + (key,), f"{label(section)} - {label(key)}", render_value(item)
+            )
+        return
+    if isinstance(content, dict):
+        for key, item in content.items():
+            if key == "players_bio" and isinstance(item, dict):
+                for player, bio in item.items():
+                    yield make_chunk(
+                        path + (key, player), f"{label(section)} - {player}", str(bio)
+                    )
+            else:
+                yield make_chunk(
+                    path + (key,),
+                    f"{label(section)} - {label(key)}",
+                    render_value(item),
+                )
+        return
+    yield make_chunk(path, label(section), render_value(content))
+
+
+# Termos de um trecho e quantas vezes aparecem. O caminho no JSON também é
+# indexado (ex.: "coaching_staff", "Valorant").
+def chunk_terms(chunk: Chunk) -> "Counter[str]":
+    return Counter(tokenize(chunk.text) + tokenize(" ".join(chunk.path[1:])))
+
+
+# Índice léxico BM25 sobre os trechos do dataset (sem dependências externas)
+class RetrievalIndex:
+    def __init__(
+        self,
+        chunks: List[Chunk],
+        k1: float = 1.5,
+        b: float = 0.75,
+        term_counts: Optional[List["Counter[str]"]] = None,
+    ):
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+        # Termos já contados de cada trecho, reaproveitados em replace_sections
+        self._term_counts = (
+            term_counts if term_counts is not None else [chunk_terms(c) for c in chunks]
+        )
+        self._postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self._lengths: List[int] = []
+        for index, counts in enumerate(self._term_counts):
+            self._lengths.append(sum(counts.values()))
+            for term, count in counts.items():
+                self._postings[term].append((index, count))
+        self._avg_length = sum(self._lengths) / len(self._lengths) if chunks else 0.0
+        total = len(chunks)
+        self._idf = {
+            term: math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self._postings.items()
+        }
+
+    @classmethod
+    def from_data(cls, furia_data: Dict[str, Any]) -> "RetrievalIndex":
+        return cls(build_chunks(furia_data))
+
+    # Trechos e termos contados em formato JSON, para os artefatos pré-calculados
+    def dump(self) -> List[List[Any]]:
+        return [
+            [list(chunk.path), chunk.text, chunk.tokens, dict(counts)]
+            for chunk, counts in zip(self.chunks, self._term_counts)
+        ]
+
+    @classmethod
+    def load(cls, items: List[List[Any]]) -> "RetrievalIndex":
+        chunks = [Chunk(tuple(path), text, tokens) for path, text, tokens, _ in items]
+        return cls(chunks, term_counts=[Counter(counts) for _, _, _, counts in items])
+
+    # Novo índice trocando os trechos das seções alteradas. Só os trechos novos
+    # são tokenizados; as listas de postings e o idf (que dependem de todos os
+    # trechos) são remontados a partir das contagens já existentes. As seções
+    # seguem `order` (ver section_order), para que o resultado seja igual ao de
+    # uma reconstrução completa: o desempate do BM25 depende da posição.
+    def replace_sections(
+        self,
+        sections: Collection[ChunkPath],
+        new_chunks: List[Chunk],
+        order: List[ChunkPath],
+    ) -> "RetrievalIndex":
+        by_section: Dict[ChunkPath, List[Tuple[Chunk, "Counter[str]"]]] = defaultdict(
+            list
+        )
+        for chunk, counts in zip(self.chunks, self._term_counts):
+            if section_of(chunk.path) not in sections:
+                by_section[section_of(chunk.path)].append((chunk, counts))
+        for chunk in new_chunks:
+            by_section[section_of(chunk.path)].append((chunk, chunk_terms(chunk)))
+
+        chunks: List[Chunk] = []
+        term_counts: List["Counter[str]"] = []
+        for section in order:
+            for chunk, counts in by_section.pop(section, ()):
+                chunks.append(chunk)
+                term_counts.append(counts)
+        # Seções fora da ordem conhecida (não deveria acontecer) ficam no fim
+        for items in by_section.values():
+            for chunk, counts in items:
+                chunks.append(chunk)
+                term_counts.append(counts)
+        return RetrievalIndex(chunks, self.k1, self.b, term_counts)
+
+    def _query_terms(self, query: str) -> List[str]:
+        terms = []
+        for term in tokenize(query):
+            if term in STOPWORDS:
+                continue
+            terms.append(term)
+            terms.extend(QUERY_SYNONYMS.get(term, []))
+        return terms
+
+    # Trechos mais relevantes para a pergunta, com suas pontuações
+    def search(self, query: str, top_k: int) -> List[Tuple[float, Chunk]]:
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(self._query_terms(query)):
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for index, count in self._postings[term]:
+                norm = 1 - self.b + self.b * self._lengths[index] / self._avg_length
+                scores[index] += idf * count * (self.k1 + 1) / (count + self.k1 * norm)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:top_k]
+        return [(score, self.chunks[index]) for index, score in ranked]
+
+    # Trechos usados quando a pergunta não casa com nada (visão geral dos times)
+    def default_chunks(self) -> List[Chunk]:
+        return [
+            chunk
+            for chunk in self.chunks
+            if chunk.path[-1] in ("lineup", "info") or chunk.path[0] == "times"
+        ]
+
+    # Trechos mais relevantes para a pergunta que cabem no orçamento de tokens
+    def select(self, query: str, top_k: int, token_budget: int) -> List[Chunk]:
+        selected = [chunk for _, chunk in self.search(query, top_k)]
+        if not selected:
+            selected = self.default_chunks()
+
+        chosen = []
+        used = estimate_tokens(CONTEXT_HEADER)
+        for chunk in selected:
+            if used + chunk.tokens > token_budget:
+                continue
+            chosen.append(chunk)
+            used += chunk.tokens
+        return chosen
+
+    # Montar o contexto do prompt com os trechos mais relevantes, dentro do orçamento de tokens
+    def build_context(self, query: str, top_k: int, token_budget: int) -> str:
+        return render_context(self.select(query, top_k, token_budget))
+
+
+def render_context(chunks: List[Chunk]) -> str:
+    return CONTEXT_HEADER + "\n".join(chunk.text for chunk in chunks)
@@ -0,0 +1,138 @@
+from typing import Any, Dict, List, Tuple, Union
+
+# Esquema do furia_esports.json usado para validar as alterações feitas pela
+# API de administração. Cada regra é um destes valores:
+#   str / int / float / bool  -> tipo do valor
+#   SCALAR                    -> texto, número ou booleano
+#   ANY                       -> qualquer valor JSON
+#   [regra]                   -> lista em que todo item segue a regra
+#   MapOf(regra)              -> objeto com chaves livres e valores na regra
+#   Fields({...}, required)   -> objeto com chaves conhecidas (outras são aceitas)
+ANY = object()
+SCALAR = object()
+
+
+class MapOf:
+    def __init__(self, rule: Any):
+        self.rule = rule
+
+
+class Fields:
+    def __init__(self, fields: Dict[str, Any], required: Tuple[str, ...] = ()):
+        self.fields = fields
+        self.required = required
+
+
+LOL_ROLES = ("top", "jungle", "mid", "adc", "support")
+
+TEAM_FIELDS = {
+    "coaching_staff": MapOf(str),
+    "latest_competition": MapOf(SCALAR),
+    "players_bio": MapOf(str),
+    "notes": [str],
+    "academy_team": Fields({"players": [str], "coach": str}),
+}
+
+SCHEMA = Fields(
+    {
+        "FURIA_Esports_2025": Fields(
+            {
+                "League_of_Legends": Fields(
+                    {
+                        **TEAM_FIELDS,
+                        "lineup": Fields({role: str for role in LOL_ROLES}, LOL_ROLES),
+                    }
+                ),
+                "Counter_Strike_2": Fields({**TEAM_FIELDS, "lineup": [str]}),
+                "Valorant": Fields({**TEAM_FIELDS, "lineup": [str]}),
+                "statistics": MapOf(MapOf(MapOf(SCALAR))),
+                "historical_titles": MapOf(
+                    [Fields({"year": int, "title": str}, ("year", "title"))]
+                ),
+                "branding": MapOf(ANY),
+                "other_modalities": MapOf(MapOf(SCALAR)),
+            }
+        ),
+        # Formato antigo do arquivo
+        "info": MapOf(SCALAR),
+        "times": MapOf(
+            Fields({"lineup": [str], "campeonatos": [str], "conquistas": [str]})
+        ),
+        "competicoes": [Fields({"nome": str, "resultado": str})],
+    }
+)
+
+Path = Tuple[str, ...]
+
+
+def _type_name(rule: Any) -> str:
+    names = {str: "texto", int: "inteiro", float: "número", bool: "booleano"}
+    return names.get(rule, "valor")
+
+
+def _check(value: Any, rule: Any, path: Path, errors: List[str]) -> None:
+    where = ".".join(path) or "(raiz)"
+    if rule is ANY:
+        return
+    if rule is SCALAR:
+        if not isinstance(value, (str, int, float, bool)):
+            errors.append(f"{where}: esperado texto ou número")
+        return
+    if isinstance(rule, list):
+        if not isinstance(value, list):
+            errors.append(f"{where}: esperado uma lista")
+            return
+        for index, item in enumerate(value):
+            _check(item, rule[0], path + (str(index),), errors)
+        return
+    if isinstance(rule, MapOf):
+        if not isinstance(value, dict):
+            errors.append(f"{where}: esperado um objeto")
+            return
+        for key, item in value.items():
+            _check(item, rule.rule, path + (key,), errors)
+        return
+    if isinstance(rule, Fields):
+        if not isinstance(value, dict):
+            errors.append(f"{where}: esperado um objeto")
+            return
+        for key in rule.required:
+            if key not in value:
+                errors.append(f"{where}: campo obrigatório ausente: {key}")
+        for key, item in value.items():
+            if key in rule.fields:
+                _check(item, rule.fields[key], path + (key,), errors)
+        return
+    # Tipos simples (bool não vale como número)
+    if rule in (int, float):
+        if isinstance(value, bool) or not isinstance(
+            value, (int, float) if rule is float else int
+        ):
+            errors.append(f"{where}: esperado {_type_name(rule)}")
+        return
+    if not isinstance(value, rule):
+        errors.append(f"{where}: esperado {_type_name(rule)}")
+
+
+# Regra do esquema para um caminho do JSON (ANY se o caminho não é conhecido)
+def rule_for(path: Path) -> Any:
+    rule: Any = SCHEMA
+    for key in path:
+        if isinstance(rule, Fields):
+            rule = rule.fields.get(key, ANY)
+        elif isinstance(rule, MapOf):
+            rule = rule.rule
+        elif isinstance(rule, list):
+            if not key.isdigit():
+                return ANY
+            rule = rule[0]
+        else:
+            return ANY
+    return rule
+
+
+# Validar o valor de um caminho do dataset. Retorna a lista de erros (vazia se válido).
+def validate(path: Union[Path, List[str]], value: Any) -> List[str]:
+    errors: List[str] = []
+    _check(value, rule_for(tuple(path)), tuple(path), errors)
+    return errors
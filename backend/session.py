@@ -0,0 +1,60 @@
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from config import SESSION_MAX_MESSAGES, SESSION_TOKEN_BUDGET
+from entities import EntityIndex
+from retrieval import estimate_tokens
+
+
+# Estado de uma conversa do chat (uma conexão WebSocket): histórico limitado
+# em número de mensagens e em tokens, e o último assunto citado (time ou jogador)
+class ChatSession:
+    def __init__(
+        self,
+        max_messages: int = SESSION_MAX_MESSAGES,
+        token_budget: int = SESSION_TOKEN_BUDGET,
+    ):
+        self.token_budget = token_budget
+        self.messages: Deque[Dict[str, str]] = deque(maxlen=max_messages)
+        self.topic: Optional[str] = None
+
+    def history(self) -> List[Dict[str, str]]:
+        return list(self.messages)
+
+    def tokens(self) -> int:
+        return sum(estimate_tokens(message["content"]) for message in self.messages)
+
+    # Guardar a pergunta e a resposta e compactar o histórico
+    def add_exchange(self, question: str, answer: str) -> None:
+        self.messages.append({"role": "user", "content": question})
+        self.messages.append({"role": "assistant", "content": answer})
+        self.compact()
+
+    # Descartar as trocas mais antigas até caber no orçamento de tokens; se só
+    # sobrar a última e ela ainda passar do limite, a resposta é encurtada
+    def compact(self) -> None:
+        while len(self.messages) > 2 and self.tokens() > self.token_budget:
+            self.messages.popleft()
+            if self.messages and self.messages[0]["role"] == "assistant":
+                self.messages.popleft()
+        excess = self.tokens() - self.token_budget
+        if excess > 0 and self.messages and self.messages[-1]["role"] == "assistant":
+            content = self.messages[-1]["content"]
+            keep = max(0, len(content) - excess * 4)
+            self.messages[-1] = {
+                "role": "assistant",
+                "content": content[:keep].rstrip() + "…",
+            }
+
+    # Pergunta usada na busca (respostas diretas, contexto e fallback): em
+    # perguntas de continuação sem time ou jogador ("e o coach deles?"),
+    # acrescenta o último assunto da conversa. Outras mensagens ("valeu!",
+    # "tchau") seguem como vieram.
+    def resolve(self, query: str, entities: EntityIndex) -> str:
+        topic = entities.topic(query)
+        if topic is not None:
+            self.topic = topic
+            return query
+        if self.topic is not None and entities.is_follow_up(query):
+            return f"{query} {self.topic}"
+        return query